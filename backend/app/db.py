@@ -1,9 +1,15 @@
+from fastapi import Request, Response
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
 from dotenv import load_dotenv
 
+from .utils.pool_metrics import MeteredAsyncAdaptedQueuePool, MeteredQueuePool
+from .utils.read_routing import ReadRouter
+
 # Load environment variables
 load_dotenv()
 
@@ -12,17 +18,120 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise RuntimeError("DATABASE_URL environment variable is not set")
 
+# Async drivers used for DATABASE_URL's database unless ASYNC_DATABASE_URL is set
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+def async_database_url(url: str) -> str:
+    """`url` with its driver swapped for the asyncio one"""
+    parsed = make_url(url)
+    if parsed.get_dialect().is_async:
+        return url
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise RuntimeError(f"No async driver known for {parsed.get_backend_name()}; set ASYNC_DATABASE_URL")
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or async_database_url(DATABASE_URL)
+
+# Optional read replica for get_read_db; without it reads use the primary
+READ_DATABASE_URL = os.getenv("READ_DATABASE_URL")
+# Reads fall back to the primary while the replica lags more than this, and a
+# caller's reads stay on the primary this long after they commit a write
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+REPLICA_LAG_CHECK_INTERVAL_SECONDS = float(os.getenv("REPLICA_LAG_CHECK_INTERVAL_SECONDS", "2"))
+
+# Connection pools, per process and engine. Sync routes run on the threadpool (40 threads by
+# default), so size + overflow caps how many of them hold a connection at once;
+# keep workers * (size + overflow) below the server's connection limit.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+# Seconds a request waits for a free connection before failing
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Reconnect connections older than this many seconds (-1 keeps them); stays below server/proxy idle timeouts
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+# Per-statement limit in milliseconds, PostgreSQL only; 0 disables it
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+
+def engine_options(url: str, **overrides) -> dict:
+    """Keyword arguments for create_engine(url) or create_async_engine(url) built from the DB_* settings"""
+    parsed = make_url(url)
+    is_async = parsed.get_dialect().is_async
+    options = {"pool_pre_ping": DB_POOL_PRE_PING}
+
+    # In-memory SQLite keeps one connection per thread; there is no pool to size
+    if not (parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:")):
+        options.update(
+            poolclass=MeteredAsyncAdaptedQueuePool if is_async else MeteredQueuePool,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+        )
+
+    if DB_STATEMENT_TIMEOUT_MS > 0 and parsed.get_backend_name() == "postgresql":
+        if is_async:
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+
+    options.update(overrides)
+    return options
+
 # Create engine
-engine = create_engine(DATABASE_URL)
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+read_engine = create_engine(READ_DATABASE_URL, **engine_options(READ_DATABASE_URL)) if READ_DATABASE_URL else None
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine) if read_engine is not None else None
+read_router = ReadRouter(
+    read_engine,
+    max_lag=REPLICA_MAX_LAG_SECONDS,
+    check_interval=REPLICA_LAG_CHECK_INTERVAL_SECONDS,
+    sticky_seconds=REPLICA_MAX_LAG_SECONDS
+)
+
+# Async engine on the same database, for async def routes. It has its own pool
+# of the same size, so a worker may hold up to twice the connections above.
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL))
+
+# Instances stay readable after commit; there is no implicit IO on attribute access
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 # Dependency to get DB session
-def get_db():
+def get_db(request: Request, response: Response):
     db = SessionLocal()
+    # Committed writes send this caller's next reads to the primary (see get_read_db)
+    db.info["on_write"] = lambda: read_router.record_write(request, response)
+    try:
+        yield db
+    finally:
+        db.close()
+
+# Dependency to get an async DB session, for async def routes. Sync (def) routes
+# run on the threadpool and keep using get_db.
+async def get_async_db(request: Request, response: Response):
+    async with AsyncSessionLocal() as db:
+        db.sync_session.info["on_write"] = lambda: read_router.record_write(request, response)
+        yield db
+
+# Dependency to get a read-only DB session for GET routes. Uses the replica
+# when one is configured, current enough, and the caller has not just written.
+def get_read_db(request: Request):
+    if not read_router.use_replica(request):
+        db = SessionLocal()
+    else:
+        db = ReadSessionLocal()
+        db.info["replica"] = True
+    db.info["read_only"] = True
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
@@ -1,8 +1,11 @@
+from sqlalchemy import func, inspect
 from sqlalchemy.orm import Session
-from .db import SessionLocal, engine, Base
+from .db import SessionLocal
 from .models.user import User
 from .models.complaint import Complaint, ComplaintUpdate
 from .models.disease_detection import CropDisease
+from .models.location import AgriService, ServiceReview
+from .services.geo import encode_geohash
 from passlib.context import CryptContext
 import os
 from dotenv import load_dotenv
@@ -10,25 +13,77 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
-# Create all tables
-Base.metadata.create_all(bind=engine)
-
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+def has_columns(db: Session, table: str, *columns: str) -> bool:
+    """Whether the database table already has the columns (i.e. the migration adding them ran)"""
+    existing = {column["name"] for column in inspect(db.connection()).get_columns(table)}
+    missing = [column for column in columns if column not in existing]
+    if missing:
+        print(f"Skipping backfill of {table}.{', '.join(missing)}: not in the database yet. Run `python manage.py migrate` first.")
+    return not missing
+
+def backfill_service_geohashes(db: Session):
+    """Populate the geohash column for services created before it existed"""
+    if not has_columns(db, "agri_services", "geohash"):
+        return
+    services = db.query(AgriService).filter(
+        AgriService.geohash == None,
+        AgriService.latitude != None,
+        AgriService.longitude != None
+    ).all()
+    
+    if services:
+        print(f"Backfilling geohash for {len(services)} services...")
+        for service in services:
+            service.geohash = encode_geohash(float(service.latitude), float(service.longitude))
+        db.commit()
+
+def backfill_rating_aggregates(db: Session):
+    """Compute review aggregates for services created before they were stored"""
+    if not has_columns(db, "agri_services", "review_count", "rating_sum", "average_rating"):
+        return
+    services = db.query(AgriService).filter(AgriService.review_count == None).all()
+    
+    if services:
+        print(f"Backfilling rating aggregates for {len(services)} services...")
+        totals = dict(
+            (service_id, (count, rating_sum))
+            for service_id, count, rating_sum in db.query(
+                ServiceReview.service_id,
+                func.count(ServiceReview.id),
+                func.sum(ServiceReview.rating)
+            ).filter(
+                ServiceReview.service_id.in_([service.id for service in services])
+            ).group_by(ServiceReview.service_id).all()
+        )
+        for service in services:
+            count, rating_sum = totals.get(service.id, (0, 0))
+            service.review_count = count
+            service.rating_sum = rating_sum or 0
+            service.average_rating = float(rating_sum) / count if count else None
+        db.commit()
+
 def init_db():
+    """Backfill derived columns and add demo data to an empty database (python manage.py seed)"""
     db = SessionLocal()
     try:
+        backfill_service_geohashes(db)
+        backfill_rating_aggregates(db)
+        
         # Check if we already have users
         user_count = db.query(User).count()
         if user_count == 0:
             print("Creating demo users...")
             
             # Create demo farmer
+            # Sample complaints below refer to these ids
             farmer = User(
+                id="1",
                 email="farmer@demo.com",
                 name="राम पाटील",
                 phone="+91-9876543210",
@@ -44,6 +99,7 @@ def init_db():
             
             # Create demo officer
             officer = User(
+                id="2",
                 email="officer@demo.com",
                 name="Dr. Priya Sharma",
                 phone="+91-9876543211",
@@ -59,6 +115,7 @@ def init_db():
             
             # Create demo expert
             expert = User(
+                id="3",
                 email="expert@demo.com",
                 name="Prof. Suresh Kumar",
                 phone="+91-9876543212",
@@ -2,6 +2,9 @@ from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordBearer
 from typing import List, Optional
+from contextlib import asynccontextmanager
+import asyncio
+import importlib
 import uvicorn
 import os
 from dotenv import load_dotenv
@@ -9,18 +12,49 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
-# Initialize database
-from .db import engine, Base
-from .init_db import init_db
+# Schema and demo data are set up by `python manage.py init`, not at import
+from .db import async_engine, engine, read_engine, read_router
+from .schema import check_schema
 
-# Create tables and initialize with demo data
-Base.metadata.create_all(bind=engine)
-init_db()
+from .services.http_client import start_http_client, close_http_client
+
+# Routers this worker serves. API_ROUTERS limits a worker to some of them
+# (e.g. API_ROUTERS=user for a sign-in pool); only those modules are imported,
+# and the weather background jobs run only where the weather router does.
+ROUTERS = ["user", "agriconnect", "agriscan", "complaints", "weather", "agridocai", "kisan_mitra"]
+API_ROUTERS = [name.strip() for name in os.getenv("API_ROUTERS", ",".join(ROUTERS)).split(",") if name.strip()]
+
+def start_weather_jobs() -> List[asyncio.Task]:
+    from .services.weather_cache import refresh_hot_cells_forever
+    from .services.weather_prefetch import WEATHER_PREFETCH_ENABLED, run_daily_prefetch_forever
+    from .services.weather_alerts import WEATHER_ALERTS_ENABLED, evaluate_weather_alerts_forever
+
+    tasks = [asyncio.create_task(refresh_hot_cells_forever())]
+    if WEATHER_PREFETCH_ENABLED:
+        tasks.append(asyncio.create_task(run_daily_prefetch_forever()))
+    if WEATHER_ALERTS_ENABLED:
+        tasks.append(asyncio.create_task(evaluate_weather_alerts_forever()))
+    return tasks
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    async with async_engine.connect() as connection:
+        await connection.run_sync(check_schema)
+    background_tasks = []
+    if "weather" in API_ROUTERS:
+        # Shared outbound HTTP client with a warm connection pool
+        await start_http_client()
+        background_tasks = start_weather_jobs()
+    yield
+    for task in background_tasks:
+        task.cancel()
+    await close_http_client()
 
 app = FastAPI(
     title="HaritSetu API",
     description="Backend API for HaritSetu - A smart, AI-integrated platform for farmers",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -30,6 +64,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Let browser clients read conditional-GET and pagination headers
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
 @app.get("/")
@@ -54,23 +90,26 @@ async def root():
     }
 
 # Import and include routers
-from .routers import user, agriconnect, agriscan, complaints
-app.include_router(user.router)
-app.include_router(agriconnect.router)
-app.include_router(agriscan.router)
-app.include_router(complaints.router)
+for router_name in API_ROUTERS:
+    if router_name not in ROUTERS:
+        raise RuntimeError(f"Unknown router in API_ROUTERS: {router_name}")
+    app.include_router(importlib.import_module(f".routers.{router_name}", __package__).router)
 
-# Add weather router
-from .routers import weather
-app.include_router(weather.router)
+from .routers.user import TokenPrincipal, get_token_principal
+from .utils.pool_metrics import pool_stats
 
-# Add AgriDocAI router
-from .routers import agridocai
-app.include_router(agridocai.router)
-
-# Add Kisan Mitra router
-from .routers import kisan_mitra
-app.include_router(kisan_mitra.router)
+@app.get("/stats/db")
+def database_stats(current_user: TokenPrincipal = Depends(get_token_principal)):
+    """Connection pool gauges and checkout wait times of this worker"""
+    if current_user.role not in ["officer", "expert"]:
+        raise HTTPException(status_code=403, detail="Not authorized to view database stats")
+    
+    return {
+        "primary": pool_stats(engine.pool),
+        "primary_async": pool_stats(async_engine.sync_engine.pool),
+        "replica": pool_stats(read_engine.pool) if read_engine is not None else None,
+        "read_routing": read_router.stats(),
+    }
 
 # These will be uncommented as we implement each module
 # from .routers import chat, ai_modules
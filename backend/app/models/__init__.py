@@ -2,7 +2,7 @@ from .document import Document, DocumentTemplate, DocumentType
 from .complaint import Complaint, ComplaintUpdate, ComplaintStatus, ComplaintPriority
 from .marketplace import Product, Order, OrderItem, ProductCategory
 from .chat import ChatSession, ChatMessage, ChatType
-from .weather import WeatherData, WeatherAlert, UserWeatherPreference
+from .weather import WeatherData, WeatherAlert, UserWeatherPreference, UserWeatherAlert
 from .disease_detection import CropDisease, DiseaseDetection
 from .education import Course, Lesson, Quiz, QuizQuestion, UserProgress
 from .location import AgriService, ServiceReview
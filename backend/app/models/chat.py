@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Enum
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Enum, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from ..db import Base
@@ -10,6 +10,12 @@ class ChatType(str, enum.Enum):
 
 class ChatSession(Base):
     __tablename__ = "chat_sessions"
+    # Keyset pagination: (filter, sort key, id)
+    __table_args__ = (
+        Index("ix_chat_sessions_user_id_updated_at_id", "user_id", "updated_at", "id"),
+        Index("ix_chat_sessions_expert_id_updated_at_id", "expert_id", "updated_at", "id"),
+        Index("ix_chat_sessions_updated_at_id", "updated_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(String(50), ForeignKey("users.id"))
@@ -27,6 +33,10 @@ class ChatSession(Base):
 
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
+    # Keyset pagination: (filter, sort key, id)
+    __table_args__ = (
+        Index("ix_chat_messages_session_id_created_at_id", "session_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     session_id = Column(Integer, ForeignKey("chat_sessions.id"))
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Enum
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Enum, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from ..db import Base
@@ -19,6 +19,14 @@ class ComplaintPriority(str, enum.Enum):
 
 class Complaint(Base):
     __tablename__ = "complaints"
+    # Keyset pagination: (filter, sort key, id), one per list filter
+    __table_args__ = (
+        Index("ix_complaints_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_complaints_assigned_to_created_at_id", "assigned_to", "created_at", "id"),
+        Index("ix_complaints_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_complaints_category_created_at_id", "category", "created_at", "id"),
+        Index("ix_complaints_created_at_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255))
@@ -39,6 +47,9 @@ class Complaint(Base):
 
 class ComplaintUpdate(Base):
     __tablename__ = "complaint_updates"
+    __table_args__ = (
+        Index("ix_complaint_updates_complaint_id", "complaint_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     complaint_id = Column(Integer, ForeignKey("complaints.id"))
@@ -1,7 +1,14 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Text, JSON
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Text, JSON, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from ..db import Base
+import enum
+
+class DetectionStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
 
 class CropDisease(Base):
     __tablename__ = "crop_diseases"
@@ -22,6 +29,12 @@ class CropDisease(Base):
 
 class DiseaseDetection(Base):
     __tablename__ = "disease_detections"
+    # Keyset pagination: (filter, sort key, id)
+    __table_args__ = (
+        Index("ix_disease_detections_user_id_created_at_id", "user_id", "created_at", "id"),
+        # Detection worker: due queued jobs in id order
+        Index("ix_disease_detections_status_available_at_id", "status", "available_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(String(50), ForeignKey("users.id"))
@@ -30,6 +43,16 @@ class DiseaseDetection(Base):
     detected_disease_id = Column(Integer, ForeignKey("crop_diseases.id"), nullable=True)
     confidence_score = Column(Float, nullable=True)
     additional_notes = Column(Text, nullable=True)
+    # Job queue state, processed by the detection worker (backend/worker.py)
+    status = Column(String(20), default=DetectionStatus.QUEUED, index=True)
+    image_path = Column(String(255), nullable=True)  # Local path of the uploaded image
+    image_sha256 = Column(String(64), nullable=True, index=True)  # Content hash, for reusing results
+    thumbnails = Column(JSON, nullable=True)  # Thumbnail URLs keyed by size, e.g. {"128": ..., "512": ...}
+    attempts = Column(Integer, default=0)
+    last_error = Column(Text, nullable=True)
+    available_at = Column(DateTime, default=datetime.utcnow)  # Earliest time of the next attempt
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
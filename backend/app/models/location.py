@@ -1,10 +1,17 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Text, JSON
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Text, JSON, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from ..db import Base
 
 class AgriService(Base):
     __tablename__ = "agri_services"
+    # Keyset pagination: (filter, sort key, id)
+    __table_args__ = (
+        Index("ix_agri_services_is_active_created_at_id", "is_active", "created_at", "id"),
+        # Listing filters
+        Index("ix_agri_services_service_type_district_is_active", "service_type", "district", "is_active"),
+        Index("ix_agri_services_district_is_active", "district", "is_active"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255))
@@ -17,6 +24,7 @@ class AgriService(Base):
     state = Column(String(100))
     latitude = Column(Float)
     longitude = Column(Float)
+    geohash = Column(String(12), nullable=True, index=True)  # Spatial index for nearby lookups
     contact_phone = Column(String(20), nullable=True)
     contact_email = Column(String(100), nullable=True)
     website = Column(String(255), nullable=True)
@@ -25,11 +33,19 @@ class AgriService(Base):
     image_urls = Column(JSON, nullable=True)  # Store as JSON array
     is_verified = Column(Boolean, default=False)
     is_active = Column(Boolean, default=True)
+    # Rating aggregates, maintained by the review routes
+    review_count = Column(Integer, default=0)
+    rating_sum = Column(Integer, default=0)
+    average_rating = Column(Float, nullable=True, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 class ServiceReview(Base):
     __tablename__ = "service_reviews"
+    # Reviews embedded in a service, newest first
+    __table_args__ = (
+        Index("ix_service_reviews_service_id_created_at_id", "service_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     service_id = Column(Integer, ForeignKey("agri_services.id"))
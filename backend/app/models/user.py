@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Table
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Table, Index
 from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -7,6 +7,11 @@ from ..db import Base, engine
 
 class User(Base):
     __tablename__ = "users"
+    # Keyset pagination: (filter, sort key, id)
+    __table_args__ = (
+        Index("ix_users_role_created_at_id", "role", "created_at", "id"),
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
 
     id = Column(String(50), primary_key=True, index=True)
     email = Column(String(255), unique=True, index=True)
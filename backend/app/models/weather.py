@@ -7,14 +7,18 @@ class WeatherData(Base):
     __tablename__ = "weather_data"
 
     id = Column(Integer, primary_key=True, index=True)
+    cell_key = Column(String(64), unique=True, index=True, nullable=True)  # Weather cache grid cell
     location = Column(String(255))
     district = Column(String(100))
     state = Column(String(100))
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
     temperature = Column(Float)
     humidity = Column(Float)
     wind_speed = Column(Float)
     precipitation = Column(Float)
     forecast = Column(JSON)  # Stores 7-day forecast data
+    fetched_at = Column(DateTime, nullable=True)  # When the forecast was fetched upstream
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -26,6 +30,7 @@ class WeatherAlert(Base):
     severity = Column(String(20))  # low, medium, high, critical
     message = Column(Text)
     message_marathi = Column(Text, nullable=True)
+    cell_key = Column(String(64), nullable=True, index=True)  # Weather cache grid cell
     location = Column(String(255))
     district = Column(String(100))
     state = Column(String(100))
@@ -47,4 +52,22 @@ class UserWeatherPreference(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
-    user = relationship("User")
\ No newline at end of file
+    user = relationship("User")
+
+class UserWeatherAlert(Base):
+    """
+    Delivery record created when a WeatherAlert is fanned out to a subscriber.
+    """
+    __tablename__ = "user_weather_alerts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(String(50), ForeignKey("users.id"), index=True)
+    alert_id = Column(Integer, ForeignKey("weather_alerts.id"), index=True)
+    preference_id = Column(Integer, ForeignKey("user_weather_preferences.id"), nullable=True)
+    notification_method = Column(String(20))  # sms, push, email, all
+    status = Column(String(20), default="pending")  # pending, sent, read
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    user = relationship("User")
+    alert = relationship("WeatherAlert")
@@ -1,13 +1,24 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query, File, UploadFile
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, or_
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from geopy.distance import geodesic
 import os
+import json
 from datetime import datetime
 
-from ..db import get_db
+from ..db import get_db, get_read_db, SessionLocal
 from ..models.location import AgriService, ServiceReview
 from ..models.user import User
+from ..utils.pagination import Page, get_page
+from ..services.geo import (
+    GEO_SNAPSHOT_ENABLED,
+    bounding_box,
+    encode_geohash,
+    geohash_prefixes_for_box,
+    haversine_km,
+    service_snapshot,
+)
 from .user import get_current_user
 
 router = APIRouter(
@@ -64,12 +75,28 @@ class ServiceResponse(ServiceBase):
     id: int
     is_verified: bool
     is_active: bool
+    review_count: int = 0
+    average_rating: Optional[float] = None
     created_at: datetime
     updated_at: datetime
 
     class Config:
         from_attributes = True
 
+class NearbyServiceResponse(ServiceResponse):
+    distance_km: float
+
+class BulkNearestPoint(BaseModel):
+    latitude: float = Field(..., ge=-90, le=90)
+    longitude: float = Field(..., ge=-180, le=180)
+    ref: Optional[str] = None  # Caller's identifier, e.g. farmer id, echoed back
+
+class BulkNearestRequest(BaseModel):
+    points: List[BulkNearestPoint] = Field(..., min_length=1, max_length=50000)
+    service_types: List[str] = Field(..., min_length=1, max_length=20)
+    k: int = Field(1, ge=1, le=20)
+    max_distance_km: Optional[float] = Field(None, gt=0)
+
 class ReviewBase(BaseModel):
     service_id: int
     rating: int = Field(..., ge=1, le=5)
@@ -88,7 +115,13 @@ class ReviewResponse(ReviewBase):
 
 class ServiceWithReviews(ServiceResponse):
     reviews: List[ReviewResponse] = []
-    average_rating: Optional[float] = None
+
+def assign_geohash(db_service: AgriService):
+    """Keep the geohash column in sync with the service coordinates"""
+    if db_service.latitude is None or db_service.longitude is None:
+        db_service.geohash = None
+    else:
+        db_service.geohash = encode_geohash(float(db_service.latitude), float(db_service.longitude))
 
 # Routes
 @router.post("/services/", response_model=ServiceResponse)
@@ -108,19 +141,21 @@ def create_service(
         **service.model_dump(),
         is_verified=is_verified
     )
+    assign_geohash(db_service)
     db.add(db_service)
     db.commit()
     db.refresh(db_service)
+    service_snapshot.invalidate()
     return db_service
 
 @router.get("/services/", response_model=List[ServiceResponse])
 def get_services(
-    skip: int = 0,
-    limit: int = 100,
     service_type: Optional[str] = None,
     district: Optional[str] = None,
     verified_only: bool = False,
-    db: Session = Depends(get_db)
+    sort_by: Optional[str] = Query(None, pattern="^(rating|newest)$", description="Sort by average rating or creation time"),
+    page: Page = Depends(get_page),
+    db: Session = Depends(get_read_db)
 ):
     query = db.query(AgriService)
     
@@ -135,62 +170,195 @@ def get_services(
     
     query = query.filter(AgriService.is_active == True)
     
-    services = query.offset(skip).limit(limit).all()
-    return services
+    # average_rating is a stored, indexed column, so sorting by it is cheap
+    if sort_by == "rating":
+        if page.cursor:
+            raise HTTPException(status_code=400, detail="Cursor pagination is not supported with sort_by=rating")
+        query = query.order_by(AgriService.average_rating.is_(None), AgriService.average_rating.desc(), AgriService.id)
+        return query.offset(page.skip).limit(page.limit).all()
+    
+    return page.paginate(query, AgriService.created_at, AgriService.id, descending=sort_by == "newest")
 
-@router.get("/services/nearby", response_model=List[ServiceResponse])
-def get_nearby_services(
-    latitude: float = Query(..., description="User's current latitude"),
-    longitude: float = Query(..., description="User's current longitude"),
-    radius: float = Query(10.0, description="Search radius in kilometers"),
-    service_type: Optional[str] = None,
-    db: Session = Depends(get_db)
+def _nearby_from_snapshot(
+    db: Session,
+    latitude: float,
+    longitude: float,
+    radius: float,
+    service_type: Optional[str],
+    limit: int
 ):
-    # Get all services (we'll filter by distance later)
-    query = db.query(AgriService).filter(AgriService.is_active == True)
+    # Rank against the in-memory coordinate arrays, then hydrate only the winners
+    ids, distances = service_snapshot.get(db).nearby(latitude, longitude, radius, service_type, limit)
+    if ids.size == 0:
+        return []
+    
+    services = {
+        service.id: service
+        for service in db.query(AgriService).filter(AgriService.id.in_(ids.tolist())).all()
+    }
+    return [
+        (float(distance), services[service_id])
+        for service_id, distance in zip(ids.tolist(), distances.tolist())
+        if service_id in services
+    ]
+
+def _nearby_from_sql(
+    db: Session,
+    latitude: float,
+    longitude: float,
+    radius: float,
+    service_type: Optional[str]
+):
+    # Prefilter in SQL: only rows inside the bounding box (and its covering
+    # geohash cells) are loaded, instead of every active service
+    min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, radius)
+    query = db.query(AgriService).filter(
+        AgriService.is_active == True,
+        AgriService.latitude.between(min_lat, max_lat),
+        AgriService.longitude.between(min_lon, max_lon)
+    )
+    
+    prefixes = geohash_prefixes_for_box(min_lat, max_lat, min_lon, max_lon)
+    if prefixes:
+        query = query.filter(or_(*[AgriService.geohash.like(f"{prefix}%") for prefix in prefixes]))
     
     if service_type:
         query = query.filter(AgriService.service_type == service_type)
     
-    all_services = query.all()
+    candidates = query.all()
+    if not candidates:
+        return []
     
-    # Filter services by distance
-    user_location = (latitude, longitude)
-    nearby_services = []
+    # Imported here so workers that never serve nearby lookups do not load numpy
+    import numpy as np
     
-    for service in all_services:
-        # Ensure we're working with Python float values, not SQLAlchemy Column objects
-        service_lat = float(service.latitude) if service.latitude is not None else 0.0
-        service_lng = float(service.longitude) if service.longitude is not None else 0.0
-        service_location = (service_lat, service_lng)
+    # Exact distance check for the candidates inside the box, in one pass
+    distances = haversine_km(
+        latitude,
+        longitude,
+        np.array([service.latitude for service in candidates], dtype=np.float64),
+        np.array([service.longitude for service in candidates], dtype=np.float64)
+    )
+    nearby_services = [
+        (float(distance), service)
+        for distance, service in zip(distances.tolist(), candidates)
+        if distance <= radius
+    ]
+    nearby_services.sort(key=lambda item: item[0])
+    return nearby_services
+
+@router.get("/services/nearby", response_model=List[NearbyServiceResponse])
+def get_nearby_services(
+    latitude: float = Query(..., ge=-90, le=90, description="User's current latitude"),
+    longitude: float = Query(..., ge=-180, le=180, description="User's current longitude"),
+    radius: float = Query(10.0, gt=0, description="Search radius in kilometers"),
+    service_type: Optional[str] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_db)
+):
+    if GEO_SNAPSHOT_ENABLED:
+        nearby_services = _nearby_from_snapshot(db, latitude, longitude, radius, service_type, skip + limit)
+    else:
+        nearby_services = _nearby_from_sql(db, latitude, longitude, radius, service_type)
+    
+    return [
+        NearbyServiceResponse(
+            **ServiceResponse.model_validate(service).model_dump(),
+            distance_km=round(distance, 3)
+        )
+        for distance, service in nearby_services[skip:skip + limit]
+    ]
+
+# Number of NDJSON lines whose service names are resolved with one query
+BULK_NAME_BATCH = 1000
+
+def _stream_bulk_nearest(request: BulkNearestRequest, snapshot):
+    latitudes = [point.latitude for point in request.points]
+    longitudes = [point.longitude for point in request.points]
+    
+    # Use a dedicated session: the request-scoped one may be closed while streaming
+    db_session = SessionLocal()
+    try:
+        pending = []
         
-        distance = geodesic(user_location, service_location).kilometers
+        def flush():
+            ids = {int(service_id) for _, _, service_ids, _ in pending for service_id in service_ids}
+            names = dict(
+                db_session.query(AgriService.id, AgriService.name).filter(AgriService.id.in_(ids)).all()
+            ) if ids else {}
+            
+            lines = []
+            for index, service_type, service_ids, distances in pending:
+                point = request.points[index]
+                lines.append(json.dumps({
+                    "index": index,
+                    "ref": point.ref,
+                    "latitude": point.latitude,
+                    "longitude": point.longitude,
+                    "service_type": service_type,
+                    "nearest": [
+                        {
+                            "service_id": int(service_id),
+                            "name": names.get(int(service_id)),
+                            "distance_km": round(float(distance), 3)
+                        }
+                        for service_id, distance in zip(service_ids, distances)
+                    ]
+                }, ensure_ascii=False) + "\n")
+            pending.clear()
+            return "".join(lines)
         
-        if distance <= radius:
-            nearby_services.append(service)
-    
-    return nearby_services
+        for service_type in request.service_types:
+            for index, service_ids, distances in snapshot.nearest_many(
+                latitudes, longitudes, service_type, request.k, request.max_distance_km
+            ):
+                pending.append((index, service_type, service_ids.tolist(), distances.tolist()))
+                if len(pending) >= BULK_NAME_BATCH:
+                    yield flush()
+        
+        if pending:
+            yield flush()
+    finally:
+        db_session.close()
+
+@router.post("/services/nearest/bulk")
+def get_bulk_nearest_services(
+    request: BulkNearestRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Find the nearest services of each requested type for many locations at once.
+    Streams one NDJSON line per (point, service_type) pair.
+    """
+    # Bulk planning queries are meant for officers and experts
+    if current_user.role not in ["officer", "expert"]:
+        raise HTTPException(status_code=403, detail="Not authorized to run bulk queries")
+    
+    snapshot = service_snapshot.get(db)
+    return StreamingResponse(_stream_bulk_nearest(request, snapshot), media_type="application/x-ndjson")
 
 @router.get("/services/{service_id}", response_model=ServiceWithReviews)
-def get_service(service_id: int, db: Session = Depends(get_db)):
+def get_service(
+    service_id: int,
+    review_skip: int = Query(0, ge=0),
+    review_limit: int = Query(10, ge=0, le=100),
+    db: Session = Depends(get_db)
+):
     service = db.query(AgriService).filter(AgriService.id == service_id).first()
     
     if service is None:
         raise HTTPException(status_code=404, detail="Service not found")
     
-    # Get reviews for this service
-    reviews = db.query(ServiceReview).filter(ServiceReview.service_id == service_id).all()
-    
-    # Calculate average rating
-    if len(reviews) > 0:
-        average_rating = float(sum(review.rating for review in reviews) / len(reviews))
-    else:
-        average_rating = None
+    # Only embed one page of the newest reviews; the rating summary comes
+    # from the stored aggregates, so this is independent of the review count
+    reviews = db.query(ServiceReview).filter(
+        ServiceReview.service_id == service_id
+    ).order_by(ServiceReview.created_at.desc(), ServiceReview.id.desc()).offset(review_skip).limit(review_limit).all()
     
-    # Create response with reviews and average rating
-    response = ServiceWithReviews.from_orm(service)
-    response.reviews = [ReviewResponse.from_orm(review) for review in reviews]
-    response.average_rating = average_rating
+    response = ServiceWithReviews.model_validate(service)
+    response.reviews = [ReviewResponse.model_validate(review) for review in reviews]
     
     return response
 
@@ -214,8 +382,10 @@ def update_service(
     for key, value in service_update.model_dump(exclude_unset=True).items():
         setattr(db_service, key, value)
     
+    assign_geohash(db_service)
     db.commit()
     db.refresh(db_service)
+    service_snapshot.invalidate()
     return db_service
 
 @router.delete("/services/{service_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -236,6 +406,7 @@ def delete_service(
     # Soft delete by setting is_active to False
     setattr(db_service, "is_active", False)
     db.commit()
+    service_snapshot.invalidate()
     
     return {"status": "success"}
 
@@ -266,6 +437,25 @@ def create_review(
     )
     
     db.add(db_review)
+    
+    # Update the aggregates in the same transaction as the insert, using
+    # column expressions so concurrent reviews don't overwrite each other
+    service_row = db.query(AgriService).filter(AgriService.id == review.service_id)
+    service_row.update(
+        {
+            AgriService.review_count: func.coalesce(AgriService.review_count, 0) + 1,
+            AgriService.rating_sum: func.coalesce(AgriService.rating_sum, 0) + review.rating
+        },
+        synchronize_session=False
+    )
+    # The average is set by a second statement, which sees the updated sum and
+    # count on every database (MySQL evaluates SET assignments left to right,
+    # others against the old row); the first UPDATE holds the row lock
+    service_row.update(
+        {AgriService.average_rating: AgriService.rating_sum * 1.0 / AgriService.review_count},
+        synchronize_session=False
+    )
+    
     db.commit()
     db.refresh(db_review)
     
@@ -276,7 +466,7 @@ def get_service_reviews(
     service_id: int,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     # Check if service exists
     service = db.query(AgriService).filter(AgriService.id == service_id).first()
@@ -1,13 +1,13 @@
 # routers/agridocai.py
 from fastapi import APIRouter, File, UploadFile, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 import uuid
 import os
 import shutil
 from datetime import datetime
 from typing import List, Optional
 
-from ..db import get_db
+from ..db import get_async_db
 from ..models.agridocai import AgriDocument, DocumentAnalysis
 from ..services.agridocai_service import analyze_document_content
 
@@ -24,7 +24,7 @@ os.makedirs(UPLOAD_DIR, exist_ok=True)
 @router.post("/analyze", response_model=dict)
 async def analyze_document(
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Upload and analyze an agricultural document (PDF, image, or docx).
@@ -90,18 +90,17 @@ async def analyze_document(
     #     upload_date=datetime.now()
     # )
     # db.add(new_doc)
-    # db.commit()
-    # db.refresh(new_doc)
+    # await db.commit()
     
     return {"analysis": analysis}
 
 @router.get("/documents", response_model=List[dict])
-async def get_documents(db: Session = Depends(get_db)):
+async def get_documents(db: AsyncSession = Depends(get_async_db)):
     """
     Get a list of all analyzed documents.
     """
     # In a real implementation, fetch from database
-    # documents = db.query(Document).all()
+    # documents = (await db.execute(select(Document))).scalars().all()
     
     # Dummy response for now
     documents = [
@@ -117,12 +116,12 @@ async def get_documents(db: Session = Depends(get_db)):
     return documents
 
 @router.get("/documents/{file_id}", response_model=dict)
-async def get_document(file_id: str, db: Session = Depends(get_db)):
+async def get_document(file_id: str, db: AsyncSession = Depends(get_async_db)):
     """
     Get details of a specific document by ID.
     """
     # In a real implementation, fetch from database
-    # document = db.query(Document).filter(Document.file_id == file_id).first()
+    # document = (await db.execute(select(Document).where(Document.file_id == file_id))).scalars().first()
     # if not document:
     #     raise HTTPException(status_code=404, detail="Document not found")
     
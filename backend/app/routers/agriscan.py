@@ -1,25 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form, Request, Response
 from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
+from typing import Dict, List, Optional
 import os
-import shutil
 import uuid
+import hashlib
 from datetime import datetime
-import numpy as np
-from PIL import Image
-import io
-import base64
+import aiofiles
+from starlette.concurrency import run_in_threadpool
 
-from ..db import get_db, SessionLocal
-from ..models.disease_detection import CropDisease, DiseaseDetection
+from ..db import get_async_db, get_db, get_read_db
+from ..models.disease_detection import CropDisease, DiseaseDetection, DetectionStatus
+from ..services.detection_queue import queue_depth
+from ..services.disease_catalog import disease_catalog, etag_matches
 from ..models.user import User
-from .user import get_current_user
+from ..utils.body_limit import body_limited_route
+from ..utils.pagination import Page, get_page
+from .user import TokenPrincipal, get_current_user, get_token_principal
+
+# Upload limits: phone photos are typically 5-10 MB
+AGRISCAN_MAX_UPLOAD_BYTES = int(os.getenv("AGRISCAN_MAX_UPLOAD_BYTES", str(15 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = 1024 * 1024
 
 router = APIRouter(
     prefix="/agriscan",
     tags=["agriscan"],
     responses={404: {"description": "Not found"}},
+    # Oversized request bodies are rejected while they are received, before multipart parsing spools them
+    route_class=body_limited_route(AGRISCAN_MAX_UPLOAD_BYTES),
 )
 
 # Pydantic models
@@ -59,8 +69,10 @@ class DetectionResponse(DetectionBase):
     id: int
     user_id: int
     image_url: str
+    thumbnails: Optional[Dict[str, str]] = None
     detected_disease_id: Optional[int] = None
     confidence_score: Optional[float] = None
+    status: Optional[str] = None
     created_at: datetime
     disease: Optional[DiseaseResponse] = None
 
@@ -73,55 +85,136 @@ class DetectionResult(BaseModel):
     confidence_score: Optional[float] = None
     message: str
 
-# Mock AI model for disease detection
-# In a real implementation, this would use a trained ML model
-def detect_disease(image_path: str, crop_type: Optional[str] = None, db: Optional[Session] = None):
+# Repeat uploads of the same photo, counted per API process
+dedup_stats = {"hits": 0, "misses": 0}
+
+# Helper function to save uploaded image
+async def save_upload_file(upload_file: UploadFile, folder: str = "uploads", max_bytes: Optional[int] = None):
     """
-    Mock function to simulate disease detection using AI.
-    In a real implementation, this would use a trained ML model.
+    Stream an upload into content-addressed storage.
+
+    The file is hashed while it is written, then moved to
+    <folder>/cas/<first two hex digits>/<sha256><ext>, so identical images
+    are stored once. Returns (file_path, file_url, sha256).
     """
-    # For demo purposes, randomly select a disease from the database
-    # or return None to simulate no disease detected
-    import random
-    
-    if db:
-        query = db.query(CropDisease)
-        if crop_type:
-            query = query.filter(CropDisease.crop_type == crop_type)
-        
-        diseases = query.all()
-        
-        if diseases:
-            # 80% chance to detect a disease, 20% chance to find nothing
-            if random.random() < 0.8:
-                disease = random.choice(diseases)
-                confidence = random.uniform(0.6, 0.98)
-                return disease.id, confidence
+    max_bytes = max_bytes or AGRISCAN_MAX_UPLOAD_BYTES
+    cas_folder = os.path.join(folder, "cas")
     
-    # No disease detected or no diseases in database
-    return None, None
-
-# Helper function to save uploaded image
-async def save_upload_file(upload_file: UploadFile, folder: str = "uploads"):
     # Create folder if it doesn't exist
-    os.makedirs(folder, exist_ok=True)
+    await run_in_threadpool(os.makedirs, cas_folder, exist_ok=True)
     
-    # Generate unique filename
     # Handle case where filename might be None
     if upload_file.filename:
-        file_extension = os.path.splitext(upload_file.filename)[1]
+        file_extension = os.path.splitext(upload_file.filename)[1].lower()
     else:
         # Default to .jpg if no filename is provided
         file_extension = ".jpg"
     
-    unique_filename = f"{uuid.uuid4()}{file_extension}"
-    file_path = os.path.join(folder, unique_filename)
+    temp_path = os.path.join(cas_folder, f".{uuid.uuid4()}.part")
+    
+    # Stream the upload to disk in chunks without blocking the event loop.
+    # The router already capped the request body; this enforces the exact
+    # limit on the file itself.
+    size = 0
+    digest = hashlib.sha256()
+    try:
+        async with aiofiles.open(temp_path, "wb") as buffer:
+            while True:
+                chunk = await upload_file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"File too large. Maximum size is {max_bytes // (1024 * 1024)} MB."
+                    )
+                digest.update(chunk)
+                await buffer.write(chunk)
+        
+        sha256 = digest.hexdigest()
+        relative_path = f"cas/{sha256[:2]}/{sha256}{file_extension}"
+        file_path = os.path.join(folder, relative_path)
+        await run_in_threadpool(_store_content, temp_path, file_path)
+    except Exception:
+        await run_in_threadpool(_remove_file, temp_path)
+        raise
+    
+    return file_path, f"/uploads/{relative_path}", sha256
+
+def _store_content(temp_path: str, file_path: str):
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    if os.path.exists(file_path):
+        # Same content is already stored
+        os.remove(temp_path)
+    else:
+        os.replace(temp_path, file_path)
+
+def _remove_file(file_path: str):
+    if os.path.exists(file_path):
+        os.remove(file_path)
+
+async def _find_previous_detection(db: AsyncSession, sha256: str, crop_type: Optional[str]) -> Optional[DiseaseDetection]:
+    """Most recent finished or in-flight detection of the same image and crop type"""
+    query = select(DiseaseDetection).where(
+        DiseaseDetection.image_sha256 == sha256,
+        DiseaseDetection.status.in_([DetectionStatus.DONE, DetectionStatus.QUEUED, DetectionStatus.RUNNING])
+    )
+    if crop_type:
+        query = query.where(DiseaseDetection.crop_type == crop_type)
+    else:
+        query = query.where(DiseaseDetection.crop_type == None)
+    return (await db.execute(query.order_by(DiseaseDetection.id.desc()).limit(1))).scalars().first()
+
+async def _create_detection(
+    db: AsyncSession,
+    user_id: str,
+    file_url: str,
+    file_path: str,
+    sha256: str,
+    crop_type: Optional[str],
+    notes: Optional[str]
+) -> DiseaseDetection:
+    """
+    Create the detection for an upload, reusing earlier work on the same image.
+
+    A finished detection of the same image and crop type is copied instead
+    of queueing inference again. If the same user's earlier upload is still
+    in the queue, that detection is returned rather than a second job.
+    """
+    previous = await _find_previous_detection(db, sha256, crop_type)
     
-    # Save file
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(upload_file.file, buffer)
+    if previous is not None and previous.status != DetectionStatus.DONE:
+        if previous.user_id == user_id:
+            dedup_stats["hits"] += 1
+            return previous
+        previous = None
     
-    return file_path, f"/uploads/{unique_filename}"
+    db_detection = DiseaseDetection(
+        user_id=user_id,
+        image_url=file_url,
+        image_path=file_path,
+        image_sha256=sha256,
+        crop_type=crop_type,
+        additional_notes=notes,
+        status=DetectionStatus.QUEUED
+    )
+    if previous is not None:
+        db_detection.status = DetectionStatus.DONE
+        db_detection.detected_disease_id = previous.detected_disease_id
+        db_detection.confidence_score = previous.confidence_score
+        db_detection.thumbnails = previous.thumbnails
+        db_detection.finished_at = datetime.utcnow()
+        dedup_stats["hits"] += 1
+    else:
+        dedup_stats["misses"] += 1
+    
+    db.add(db_detection)
+    await db.commit()
+    if db_detection.detected_disease_id is not None:
+        # Load the disease for the response; async sessions do not lazy-load
+        await db.refresh(db_detection, ["disease"])
+    return db_detection
 
 # Routes
 @router.post("/diseases/", response_model=DiseaseResponse)
@@ -144,42 +237,60 @@ def create_disease(
     db.add(db_disease)
     db.commit()
     db.refresh(db_disease)
+    disease_catalog.invalidate()
     return db_disease
 
+def _catalog_headers(etag: str) -> dict:
+    # Clients may keep their copy but must revalidate it with If-None-Match
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
 @router.get("/diseases/", response_model=List[DiseaseResponse])
 def get_diseases(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     crop_type: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    query = db.query(CropDisease)
+    catalog = disease_catalog.get(db)
     
-    if crop_type:
-        query = query.filter(CropDisease.crop_type == crop_type)
+    if etag_matches(request.headers.get("if-none-match"), catalog.etag):
+        return Response(status_code=304, headers=_catalog_headers(catalog.etag))
     
-    diseases = query.offset(skip).limit(limit).all()
-    return diseases
+    response.headers.update(_catalog_headers(catalog.etag))
+    return catalog.filter(crop_type)[skip:skip + limit]
 
 @router.get("/diseases/{disease_id}", response_model=DiseaseResponse)
 def get_disease(
     disease_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db)
 ):
-    disease = db.query(CropDisease).filter(CropDisease.id == disease_id).first()
+    catalog = disease_catalog.get(db)
+    disease = catalog.by_id.get(disease_id)
+    
+    if disease is None:
+        # May have been added by another worker since the snapshot was taken
+        if db.query(CropDisease.id).filter(CropDisease.id == disease_id).first() is None:
+            raise HTTPException(status_code=404, detail="Disease not found")
+        disease_catalog.invalidate()
+        catalog = disease_catalog.get(db)
+        disease = catalog.by_id[disease_id]
     
-    if not disease:
-        raise HTTPException(status_code=404, detail="Disease not found")
+    if etag_matches(request.headers.get("if-none-match"), catalog.etag):
+        return Response(status_code=304, headers=_catalog_headers(catalog.etag))
     
+    response.headers.update(_catalog_headers(catalog.etag))
     return disease
 
 @router.post("/detect/", response_model=DetectionResult)
 async def detect_crop_disease(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     crop_type: Optional[str] = Form(None),
     notes: Optional[str] = Form(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     # Validate file type
@@ -191,77 +302,48 @@ async def detect_crop_disease(
     
     try:
         # Save uploaded image
-        file_path, file_url = await save_upload_file(file, folder="uploads")
+        file_path, file_url, sha256 = await save_upload_file(file, folder="uploads")
         
-        # Create detection record
-        db_detection = DiseaseDetection(
-            user_id=current_user.id,
-            image_url=file_url,
-            crop_type=crop_type,
-            additional_notes=notes
-        )
-        db.add(db_detection)
-        db.commit()
-        db.refresh(db_detection)
+        # Create the detection as a queued job; the detection worker
+        # (backend/worker.py) picks it up and runs inference.
+        detection = await _create_detection(db, current_user.id, file_url, file_path, sha256, crop_type, notes)
         
-        # Run disease detection in background
-        # In a real app, this would be a more complex ML task
-        # Get the actual integer value from the SQLAlchemy model instance
-        detection_id_int = db_detection.id
-        background_tasks.add_task(process_detection, detection_id_int, file_path, crop_type, db)
+        if detection.status == DetectionStatus.DONE:
+            return {
+                "detection_id": detection.id,
+                "disease": detection.disease,
+                "confidence_score": detection.confidence_score,
+                "message": "This image was analysed before. Showing the earlier result."
+            }
         
         return {
-            "detection_id": detection_id_int,
+            "detection_id": detection.id,
             "disease": None,
             "confidence_score": None,
-            "message": "Image uploaded successfully. Processing has started."
+            "message": "Image uploaded successfully. Processing has been queued."
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"An error occurred during file upload: {str(e)}"
         )
 
-def process_detection(detection_id: int, image_path: str, crop_type: Optional[str], db: Session):
-    """
-    Process the detection in the background.
-    In a real app, this would call a machine learning model.
-    """
-    db_session = SessionLocal()
-    try:
-        # Get the detection record
-        detection = db_session.query(DiseaseDetection).filter(DiseaseDetection.id == detection_id).first()
-        
-        if not detection:
-            return
-        
-        # Run disease detection
-        disease_id, confidence = detect_disease(image_path, crop_type, db_session)
-        
-        # Update detection record with results
-        # Handle the case where disease_id might be None
-        detection.detected_disease_id = disease_id  # SQLAlchemy will handle None values correctly
-        detection.confidence_score = confidence  # SQLAlchemy will handle None values correctly
-        
-        db_session.commit()
-    
-    except Exception as e:
-        print(f"Error processing detection {detection_id}: {str(e)}")
-    
-    finally:
-        db_session.close()
-
 @router.get("/detections/", response_model=List[DetectionResponse])
 def get_user_detections(
-    skip: int = 0,
-    limit: int = 100,
+    page: Page = Depends(get_page),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: TokenPrincipal = Depends(get_token_principal)
 ):
-    detections = db.query(DiseaseDetection).filter(
+    # Load each detection's disease in the same query instead of one query per row
+    query = db.query(DiseaseDetection).options(
+        joinedload(DiseaseDetection.disease)
+    ).filter(
         DiseaseDetection.user_id == current_user.id
-    ).order_by(DiseaseDetection.created_at.desc()).offset(skip).limit(limit).all()
+    )
+    detections = page.paginate(query, DiseaseDetection.created_at, DiseaseDetection.id, descending=True)
     
     return detections
 
@@ -269,9 +351,11 @@ def get_user_detections(
 def get_detection(
     detection_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: TokenPrincipal = Depends(get_token_principal)
 ):
-    detection = db.query(DiseaseDetection).filter(
+    detection = db.query(DiseaseDetection).options(
+        joinedload(DiseaseDetection.disease)
+    ).filter(
         DiseaseDetection.id == detection_id
     ).first()
     
@@ -284,6 +368,24 @@ def get_detection(
     
     return detection
 
+@router.get("/stats")
+def get_agriscan_stats(
+    db: Session = Depends(get_db),
+    current_user: TokenPrincipal = Depends(get_token_principal)
+):
+    """Detection queue depth by status and upload dedup counters"""
+    if current_user.role not in ["officer", "expert"]:
+        raise HTTPException(status_code=403, detail="Not authorized to view AgriScan stats")
+    
+    lookups = dedup_stats["hits"] + dedup_stats["misses"]
+    return {
+        "queue": queue_depth(db),
+        "dedup": {
+            **dedup_stats,
+            "hit_ratio": round(dedup_stats["hits"] / lookups, 3) if lookups else 0.0,
+        },
+    }
+
 @router.get("/crop-types", response_model=List[str])
 def get_crop_types():
     # Return predefined crop types
@@ -299,5 +401,3 @@ def get_crop_types():
         "soybean",
         "groundnut"
     ]
-
-# SessionLocal is now imported at the top of the file
\ No newline at end of file
@@ -1,13 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from typing import List, Optional
 from datetime import datetime
 from pydantic import BaseModel
 
-from ..db import get_db
+from ..db import get_db, get_read_db
 from ..models.chat import ChatSession, ChatMessage, ChatType
 from ..models.user import User
-from .user import get_current_user
+from ..utils.pagination import Page, get_page
+from .user import TokenPrincipal, get_current_user, get_token_principal
 
 router = APIRouter(
     prefix="/chat",
@@ -102,25 +103,21 @@ def create_chat_session(
 
 @router.get("/sessions", response_model=List[ChatSessionResponse])
 def read_chat_sessions(
-    skip: int = 0,
-    limit: int = 100,
+    page: Page = Depends(get_page),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: TokenPrincipal = Depends(get_token_principal)
 ):
+    # Load the messages of the whole page with one extra IN query
+    query = db.query(ChatSession).options(selectinload(ChatSession.messages))
+    
     # Get sessions based on user role
     if current_user.role == "farmer":
-        sessions = db.query(ChatSession).filter(
-            ChatSession.user_id == current_user.id
-        ).order_by(ChatSession.updated_at.desc()).offset(skip).limit(limit).all()
+        query = query.filter(ChatSession.user_id == current_user.id)
     elif current_user.role == "expert":
-        sessions = db.query(ChatSession).filter(
-            ChatSession.expert_id == current_user.id
-        ).order_by(ChatSession.updated_at.desc()).offset(skip).limit(limit).all()
-    else:
-        # Officers can see all sessions
-        sessions = db.query(ChatSession).order_by(
-            ChatSession.updated_at.desc()
-        ).offset(skip).limit(limit).all()
+        query = query.filter(ChatSession.expert_id == current_user.id)
+    # Officers can see all sessions
+    
+    sessions = page.paginate(query, ChatSession.updated_at, ChatSession.id, descending=True)
     
     return sessions
 
@@ -128,9 +125,11 @@ def read_chat_sessions(
 def read_chat_session(
     session_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: TokenPrincipal = Depends(get_token_principal)
 ):
-    session = db.query(ChatSession).filter(ChatSession.id == session_id).first()
+    session = db.query(ChatSession).options(
+        selectinload(ChatSession.messages)
+    ).filter(ChatSession.id == session_id).first()
     if session is None:
         raise HTTPException(status_code=404, detail="Chat session not found")
     
@@ -191,10 +190,9 @@ def create_chat_message(
 @router.get("/sessions/{session_id}/messages", response_model=List[ChatMessageResponse])
 def read_chat_messages(
     session_id: int,
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    page: Page = Depends(get_page),
+    db: Session = Depends(get_read_db),
+    current_user: TokenPrincipal = Depends(get_token_principal)
 ):
     session = db.query(ChatSession).filter(ChatSession.id == session_id).first()
     if session is None:
@@ -206,8 +204,7 @@ def read_chat_messages(
     elif current_user.role == "expert" and session.expert_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to view messages in this chat session")
     
-    messages = db.query(ChatMessage).filter(
-        ChatMessage.session_id == session_id
-    ).order_by(ChatMessage.created_at).offset(skip).limit(limit).all()
+    query = db.query(ChatMessage).filter(ChatMessage.session_id == session_id)
+    messages = page.paginate(query, ChatMessage.created_at, ChatMessage.id)
     
     return messages
\ No newline at end of file
@@ -1,13 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from typing import List, Optional
 from datetime import datetime
 from pydantic import BaseModel
 
-from ..db import get_db
+from ..db import get_db, get_read_db
 from ..models.complaint import Complaint, ComplaintUpdate, ComplaintStatus, ComplaintPriority
 from ..models.user import User
-from .user import get_current_user
+from ..utils.pagination import Page, get_page
+from .user import TokenPrincipal, get_current_user, get_token_principal
 
 router = APIRouter(
     prefix="/complaints",
@@ -79,14 +80,14 @@ def create_complaint(
 
 @router.get("/", response_model=List[ComplaintResponse])
 def read_complaints(
-    skip: int = 0,
-    limit: int = 100,
     status: Optional[str] = None,
     category: Optional[str] = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    page: Page = Depends(get_page),
+    db: Session = Depends(get_read_db),
+    current_user: TokenPrincipal = Depends(get_token_principal)
 ):
-    query = db.query(Complaint)
+    # Load the updates of the whole page with one extra IN query
+    query = db.query(Complaint).options(selectinload(Complaint.updates))
     
     # Filter based on user role
     if current_user.role == "farmer":
@@ -103,16 +104,18 @@ def read_complaints(
     if category:
         query = query.filter(Complaint.category == category)
     
-    complaints = query.order_by(Complaint.created_at.desc()).offset(skip).limit(limit).all()
+    complaints = page.paginate(query, Complaint.created_at, Complaint.id, descending=True)
     return complaints
 
 @router.get("/{complaint_id}", response_model=ComplaintResponse)
 def read_complaint(
     complaint_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: Session = Depends(get_read_db),
+    current_user: TokenPrincipal = Depends(get_token_principal)
 ):
-    complaint = db.query(Complaint).filter(Complaint.id == complaint_id).first()
+    complaint = db.query(Complaint).options(
+        selectinload(Complaint.updates)
+    ).filter(Complaint.id == complaint_id).first()
     if complaint is None:
         raise HTTPException(status_code=404, detail="Complaint not found")
     
@@ -1,11 +1,11 @@
 # routers/kisan_mitra.py
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime
 
-from ..db import get_db
+from ..db import get_async_db
 from ..services.language_service import translate_text
 
 router = APIRouter(
@@ -54,7 +54,7 @@ COMMON_QUESTIONS = {
 }
 
 @router.post("/ask", response_model=AdviceResponse)
-async def get_advice(req: AdviceRequest, db: Session = Depends(get_db)):
+async def get_advice(req: AdviceRequest, db: AsyncSession = Depends(get_async_db)):
     """
     Get agricultural advice based on the farmer's question.
     Supports both English and Marathi languages.
@@ -109,7 +109,7 @@ async def get_advice(req: AdviceRequest, db: Session = Depends(get_db)):
     #     crop_type=req.crop_type
     # )
     # db.add(new_query)
-    # db.commit()
+    # await db.commit()
     
     return {
         "question": question,
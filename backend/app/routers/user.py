@@ -1,14 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from pydantic import BaseModel, EmailStr, Field
 
-from ..db import get_db
+from ..db import get_async_db, get_db
 from ..models.user import User
+from ..services.auth_cache import AUTH_CACHE_ENABLED, principal_cache
+from ..services.password_hasher import PasswordHasherBusy, password_hasher
+from ..utils.pagination import Page, get_page
 
 router = APIRouter(
     prefix="/users",
@@ -16,9 +20,6 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 # JWT settings from environment variables
 import os
 from dotenv import load_dotenv
@@ -69,55 +70,115 @@ class Token(BaseModel):
 
 class TokenData(BaseModel):
     email: Optional[str] = None
+    issued_at: Optional[int] = None
+
+class TokenPrincipal(BaseModel):
+    """Identity carried by the access token itself (no database lookup)"""
+    id: str
+    email: str
+    role: str
 
 # Helper functions
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password, hashed_password):
+    try:
+        return await password_hasher.verify(plain_password, hashed_password)
+    except PasswordHasherBusy:
+        raise _busy_exception()
+
+async def get_password_hash(password):
+    try:
+        return await password_hasher.hash(password)
+    except PasswordHasherBusy:
+        raise _busy_exception()
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
+def _busy_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many sign-in requests, please retry shortly",
+        headers={"Retry-After": "1"},
+    )
 
-def authenticate_user(db: Session, email: str, password: str):
-    user = db.query(User).filter(User.email == email).first()
+async def authenticate_user(db: AsyncSession, email: str, password: str):
+    user = (await db.execute(select(User).where(User.email == email))).scalars().first()
     if not user:
         return False
-    if not verify_password(password, user.password):
+    if not await verify_password(password, user.password):
         return False
     return user
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
+    now = datetime.utcnow()
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = now + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
+        expire = now + timedelta(minutes=15)
+    to_encode.update({"exp": expire, "iat": now})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def _decode_token(token: str) -> dict:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: Optional[str] = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-        token_data = TokenData(email=email)
     except JWTError:
-        raise credentials_exception
-    user = db.query(User).filter(User.email == token_data.email).first()
+        raise _credentials_exception()
+    if payload.get("sub") is None:
+        raise _credentials_exception()
+    return payload
+
+async def _load_user(db: AsyncSession, payload: dict) -> User:
+    # Tokens issued before iat was added fall back to their expiry time as the key
+    token_data = TokenData(email=payload["sub"], issued_at=payload.get("iat") or payload.get("exp"))
+    
+    if AUTH_CACHE_ENABLED:
+        user = principal_cache.get(token_data.email, token_data.issued_at)
+        if user is not None:
+            return user
+    
+    user = (await db.execute(select(User).where(User.email == token_data.email))).scalars().first()
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
+    
+    if AUTH_CACHE_ENABLED:
+        principal_cache.set(token_data.email, token_data.issued_at, user)
     return user
 
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    """
+    The authenticated user.
+
+    Users are cached briefly per token (see services/auth_cache.py), so most
+    requests skip the users query. The returned instance is detached on a
+    cache hit; load the user through `db` before modifying it.
+    """
+    return await _load_user(db, _decode_token(token))
+
+async def get_token_principal(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    """
+    The caller's id, email and role for read-only routes.
+
+    Taken from the token's uid/role claims without touching the database;
+    older tokens without those claims fall back to get_current_user. A role
+    change takes effect for these routes when the user's token is renewed.
+    """
+    payload = _decode_token(token)
+    if payload.get("uid") is not None and payload.get("role"):
+        return TokenPrincipal(id=str(payload["uid"]), email=payload["sub"], role=payload["role"])
+    
+    user = await _load_user(db, payload)
+    return TokenPrincipal(id=str(user.id), email=user.email, role=user.role)
+
 # Routes
 @router.post("/token", response_model=Token)
-async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = authenticate_user(db, form_data.username, form_data.password)
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -126,17 +187,18 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
         )
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+        data={"sub": user.email, "uid": str(user.id), "role": user.role},
+        expires_delta=access_token_expires
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.post("/", response_model=UserResponse)
-def create_user(user: UserCreate, db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(User.email == user.email).first()
+async def create_user(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    db_user = (await db.execute(select(User).where(User.email == user.email))).scalars().first()
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash(user.password)
     db_user = User(
         email=user.email,
         name=user.name,
@@ -150,8 +212,8 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
         verified=False
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
 
 @router.get("/me", response_model=UserResponse)
@@ -164,18 +226,34 @@ def update_user(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
+    # current_user may be a cached, detached copy; update the stored row
+    db_user = db.query(User).filter(User.id == current_user.id).first()
+    if db_user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    
     for key, value in user_update.dict(exclude_unset=True).items():
-        setattr(current_user, key, value)
+        setattr(db_user, key, value)
     
     db.commit()
-    db.refresh(current_user)
-    return current_user
+    db.refresh(db_user)
+    principal_cache.invalidate(db_user.email)
+    return db_user
+
+@router.get("/stats")
+def get_auth_stats(current_user: TokenPrincipal = Depends(get_token_principal)):
+    """Password hashing pool and principal cache counters"""
+    if current_user.role not in ["officer", "expert"]:
+        raise HTTPException(status_code=403, detail="Not authorized to view auth stats")
+    
+    return {
+        "password_hashing": password_hasher.stats(),
+        "principal_cache": principal_cache.stats(),
+    }
 
 @router.get("/", response_model=List[UserResponse])
 def read_users(
-    skip: int = 0,
-    limit: int = 100,
     role: Optional[str] = None,
+    page: Page = Depends(get_page),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -187,5 +265,5 @@ def read_users(
     if role:
         query = query.filter(User.role == role)
     
-    users = query.offset(skip).limit(limit).all()
+    users = page.paginate(query, User.created_at, User.id)
     return users
\ No newline at end of file
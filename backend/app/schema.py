@@ -0,0 +1,85 @@
+# schema.py
+import ast
+import glob
+import os
+from typing import Dict, Optional, Sequence, Set, Union
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+# The app refuses to start (strict), logs (warn) or skips the check (off)
+# when the database is not migrated to the latest Alembic revision
+SCHEMA_CHECK = os.getenv("SCHEMA_CHECK", "strict").lower()
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ALEMBIC_INI = os.path.join(BACKEND_DIR, "alembic.ini")
+MIGRATION_VERSIONS_DIR = os.path.join(BACKEND_DIR, "migrations", "versions")
+
+class SchemaVersionError(RuntimeError):
+    """The database schema is not at the revision this code expects"""
+
+def alembic_config():
+    # Alembic is only imported by the CLI; importing it at startup costs more than the check itself
+    from alembic.config import Config
+    return Config(ALEMBIC_INI)
+
+def head_revisions() -> Set[str]:
+    """Revisions no other migration builds on, read from the migration files without importing them"""
+    down_revisions: Dict[str, Union[str, Sequence[str], None]] = {}
+    for path in glob.glob(os.path.join(MIGRATION_VERSIONS_DIR, "*.py")):
+        with open(path, encoding="utf-8") as f:
+            values = _module_constants(f.read(), ("revision", "down_revision"))
+        if values.get("revision"):
+            down_revisions[values["revision"]] = values.get("down_revision")
+
+    parents = set()
+    for down_revision in down_revisions.values():
+        if isinstance(down_revision, str):
+            parents.add(down_revision)
+        elif down_revision:
+            parents.update(down_revision)
+    return set(down_revisions) - parents
+
+def _module_constants(source: str, names) -> Dict[str, Optional[object]]:
+    values = {}
+    for node in ast.parse(source).body:
+        if isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name) and node.value is not None:
+            target, value = node.target.id, node.value
+        elif isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            target, value = node.targets[0].id, node.value
+        else:
+            continue
+        if target in names:
+            values[target] = ast.literal_eval(value)
+    return values
+
+def current_revisions(connection: Connection) -> Set[str]:
+    """Revisions recorded in the database's alembic_version table"""
+    if not inspect(connection).has_table("alembic_version"):
+        return set()
+    return set(connection.execute(text("SELECT version_num FROM alembic_version")).scalars())
+
+def verify_schema_version(connection: Connection):
+    """Raise SchemaVersionError unless the database is at the Alembic head"""
+    current, head = current_revisions(connection), head_revisions()
+    if current != head:
+        raise SchemaVersionError(
+            f"Database schema is at {', '.join(sorted(current)) or 'no revision'}, expected {', '.join(sorted(head))}. "
+            "Run `python manage.py migrate` (or `python manage.py init` for a new database)."
+        )
+
+def check_schema(connection: Connection):
+    """verify_schema_version, failing or warning as SCHEMA_CHECK says; run at API and worker startup"""
+    if SCHEMA_CHECK == "off":
+        return
+    try:
+        verify_schema_version(connection)
+    except SchemaVersionError as e:
+        if SCHEMA_CHECK == "strict":
+            raise
+        print(f"Warning: {e}")
+
+def upgrade_schema():
+    """Apply all migrations (alembic upgrade head)"""
+    from alembic import command
+    command.upgrade(alembic_config(), "head")
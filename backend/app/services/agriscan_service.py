@@ -0,0 +1,22 @@
+# services/agriscan_service.py
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from .disease_catalog import disease_catalog
+from .inference import BatchInferenceEngine, load_model
+
+# One engine (and model) per process, loaded on first use
+_engine: Optional[BatchInferenceEngine] = None
+_engine_catalog_version: Optional[str] = None
+
+def get_inference_engine(db: Session) -> BatchInferenceEngine:
+    """The process's engine, with model labels resolved against the cached disease catalog"""
+    global _engine, _engine_catalog_version
+    catalog = disease_catalog.get(db)
+    if _engine is None:
+        _engine = BatchInferenceEngine(load_model(list(catalog.labels)), catalog.labels)
+    elif catalog.version != _engine_catalog_version:
+        _engine.update_catalog(catalog.labels)
+    _engine_catalog_version = catalog.version
+    return _engine
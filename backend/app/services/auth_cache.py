@@ -0,0 +1,93 @@
+# services/auth_cache.py
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Set, Tuple
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+from ..models.user import User
+
+AUTH_CACHE_ENABLED = os.getenv("AUTH_CACHE_ENABLED", "true").lower() == "true"
+# Short, because profile/role changes made through another worker are only seen after expiry
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "30"))
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+
+class PrincipalCache:
+    """
+    LRU cache of authenticated users, keyed by (token subject, token iat).
+
+    Only column values are stored. Each hit builds a fresh detached User,
+    so requests never share an ORM instance and a route can still attach
+    it to its session (db.add / db.merge) if it needs to write.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._keys_by_subject: Dict[str, Set[Tuple[str, Hashable]]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, subject: str, issued_at: Hashable) -> Optional[User]:
+        key = (subject, issued_at)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._discard(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            values = entry[1]
+
+        user = User()
+        for name, value in values.items():
+            set_committed_value(user, name, value)
+        make_transient_to_detached(user)
+        return user
+
+    def set(self, subject: str, issued_at: Hashable, user: User):
+        values = {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+        key = (subject, issued_at)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, values)
+            self._entries.move_to_end(key)
+            self._keys_by_subject.setdefault(subject, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._discard(next(iter(self._entries)))
+
+    def invalidate(self, subject: Optional[str] = None):
+        """Drop every cached token of `subject`, or everything"""
+        with self._lock:
+            if subject is None:
+                self._entries.clear()
+                self._keys_by_subject.clear()
+                return
+            for key in list(self._keys_by_subject.get(subject, ())):
+                self._discard(key)
+
+    def _discard(self, key: Tuple[str, Hashable]):
+        self._entries.pop(key, None)
+        keys = self._keys_by_subject.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_subject[key[0]]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+principal_cache = PrincipalCache(maxsize=AUTH_CACHE_MAX_ENTRIES, ttl=AUTH_CACHE_TTL_SECONDS)
@@ -0,0 +1,313 @@
+# services/detection_queue.py
+import os
+import posixpath
+import signal
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..db import SessionLocal, engine
+from ..models.disease_detection import DetectionStatus, DiseaseDetection
+
+# Worker settings
+DETECTION_WORKER_PROCESSES = int(os.getenv("DETECTION_WORKER_PROCESSES", str(os.cpu_count() or 2)))
+DETECTION_POLL_INTERVAL_SECONDS = float(os.getenv("DETECTION_POLL_INTERVAL_SECONDS", "1"))
+DETECTION_MAX_ATTEMPTS = int(os.getenv("DETECTION_MAX_ATTEMPTS", "3"))
+DETECTION_RETRY_BASE_SECONDS = float(os.getenv("DETECTION_RETRY_BASE_SECONDS", "10"))
+# Jobs left "running" longer than this (e.g. the worker was killed) are requeued
+DETECTION_RUNNING_TIMEOUT_SECONDS = float(os.getenv("DETECTION_RUNNING_TIMEOUT_SECONDS", "600"))
+# How often the worker logs inference throughput
+DETECTION_STATS_INTERVAL_SECONDS = float(os.getenv("DETECTION_STATS_INTERVAL_SECONDS", "60"))
+
+def claim_jobs(db: Session, limit: int) -> List[Tuple[int, str, Optional[str]]]:
+    """
+    Atomically claim up to `limit` queued detections that are due.
+
+    SELECT ... FOR UPDATE SKIP LOCKED lets several workers poll the same
+    table without claiming the same row twice. Returns
+    (detection_id, image_path, crop_type) tuples.
+    """
+    now = datetime.utcnow()
+    jobs = db.query(DiseaseDetection).filter(
+        DiseaseDetection.status == DetectionStatus.QUEUED,
+        DiseaseDetection.available_at <= now
+    ).order_by(DiseaseDetection.id).limit(limit).with_for_update(skip_locked=True).all()
+
+    claimed = []
+    for job in jobs:
+        job.status = DetectionStatus.RUNNING
+        job.attempts = (job.attempts or 0) + 1
+        job.started_at = now
+        claimed.append((job.id, job.image_path, job.crop_type))
+    db.commit()
+    return claimed
+
+def complete_job(
+    db: Session,
+    detection_id: int,
+    disease_id: Optional[int],
+    confidence: Optional[float],
+    thumbnails: Optional[Dict[str, str]] = None
+):
+    """Store the result; `thumbnails` maps size -> file name next to the original upload"""
+    job = db.query(DiseaseDetection).filter(DiseaseDetection.id == detection_id).first()
+    if job is None:
+        return
+
+    job.status = DetectionStatus.DONE
+    job.detected_disease_id = disease_id
+    job.confidence_score = confidence
+    job.last_error = None
+    job.finished_at = datetime.utcnow()
+    if thumbnails and job.image_url:
+        folder_url = posixpath.dirname(job.image_url)
+        job.thumbnails = {size: posixpath.join(folder_url, name) for size, name in thumbnails.items()}
+    db.commit()
+
+def fail_job(db: Session, detection_id: int, error: str):
+    """Requeue a failed job with exponential backoff, or mark it failed for good"""
+    job = db.query(DiseaseDetection).filter(DiseaseDetection.id == detection_id).first()
+    if job is None:
+        return
+
+    job.last_error = error[:2000]
+    attempts = job.attempts or 0
+    if attempts >= DETECTION_MAX_ATTEMPTS:
+        job.status = DetectionStatus.FAILED
+        job.finished_at = datetime.utcnow()
+    else:
+        job.status = DetectionStatus.QUEUED
+        job.available_at = datetime.utcnow() + timedelta(seconds=DETECTION_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+    db.commit()
+
+def requeue_stale_jobs(db: Session) -> Tuple[int, int]:
+    """
+    Return jobs whose worker died mid-run to the queue.
+
+    Jobs that already used DETECTION_MAX_ATTEMPTS are marked failed instead,
+    so an upload that keeps crashing its worker is not retried forever.
+    Returns (requeued, failed).
+    """
+    now = datetime.utcnow()
+    stale = db.query(DiseaseDetection).filter(
+        DiseaseDetection.status == DetectionStatus.RUNNING,
+        DiseaseDetection.started_at < now - timedelta(seconds=DETECTION_RUNNING_TIMEOUT_SECONDS)
+    )
+    failed = stale.filter(DiseaseDetection.attempts >= DETECTION_MAX_ATTEMPTS).update(
+        {
+            DiseaseDetection.status: DetectionStatus.FAILED,
+            DiseaseDetection.last_error: "Worker stopped while processing this detection",
+            DiseaseDetection.finished_at: now,
+        },
+        synchronize_session=False
+    )
+    requeued = stale.update(
+        {
+            DiseaseDetection.status: DetectionStatus.QUEUED,
+            DiseaseDetection.available_at: now,
+        },
+        synchronize_session=False
+    )
+    db.commit()
+    return requeued, failed
+
+def release_jobs(db: Session, detection_ids: List[int]):
+    """Put claimed jobs that never started back in the queue without using up an attempt"""
+    db.query(DiseaseDetection).filter(
+        DiseaseDetection.id.in_(detection_ids),
+        DiseaseDetection.status == DetectionStatus.RUNNING
+    ).update(
+        {
+            DiseaseDetection.status: DetectionStatus.QUEUED,
+            DiseaseDetection.attempts: DiseaseDetection.attempts - 1,
+            DiseaseDetection.available_at: datetime.utcnow(),
+        },
+        synchronize_session=False
+    )
+    db.commit()
+
+def queue_depth(db: Session) -> Dict[str, int]:
+    """Number of detections in each status"""
+    counts = {status.value: 0 for status in DetectionStatus}
+    for status, count in db.query(DiseaseDetection.status, func.count(DiseaseDetection.id)).group_by(
+        DiseaseDetection.status
+    ).all():
+        if status is not None:
+            counts[status] = count
+    return counts
+
+def _init_worker_process():
+    # Don't reuse connections inherited from the parent process
+    engine.dispose(close=False)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # The parent's graceful-stop handler is inherited on fork; let the pool terminate its processes
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+def claim_batch(db: Session, max_size: int, max_wait_ms: float) -> List[Tuple[int, str, Optional[str]]]:
+    """
+    Claim a micro-batch of jobs.
+
+    When fewer than max_size jobs are queued, keep polling for up to
+    max_wait_ms so uploads arriving close together share a forward pass.
+    An empty queue returns immediately.
+    """
+    batch = claim_jobs(db, max_size)
+    if not batch:
+        return batch
+
+    deadline = time.monotonic() + max_wait_ms / 1000
+    while len(batch) < max_size:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        time.sleep(min(remaining, max_wait_ms / 5000))
+        batch.extend(claim_jobs(db, max_size - len(batch)))
+    return batch
+
+def run_detection_batch(jobs: List[Tuple[int, str, Optional[str]]]) -> Tuple[List[Tuple[Optional[int], Optional[float], Optional[str], Optional[Dict[str, str]]]], float]:
+    """
+    Run inference for a micro-batch of detections; executed in a worker process.
+
+    Each upload is decoded once to write its thumbnails and model-input
+    image, and the model reads the small model-input images. Returns one
+    (disease_id, confidence, error, thumbnail names) per job and the
+    seconds spent.
+    """
+    from .agriscan_service import get_inference_engine
+    from .image_derivatives import build_derivatives
+
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        engine = get_inference_engine(db)
+    finally:
+        db.close()
+
+    results: List[Tuple[Optional[int], Optional[float], Optional[str], Optional[Dict[str, str]]]] = []
+    items = []
+    positions = []
+    for position, (_, image_path, crop_type) in enumerate(jobs):
+        try:
+            paths = build_derivatives(image_path, engine.model.input_size)
+        except Exception as e:
+            results.append((None, None, f"Could not read image: {str(e)}", None))
+            continue
+        thumbnails = {size: os.path.basename(path) for size, path in paths.items() if size != "model"}
+        results.append((None, None, None, thumbnails))
+        items.append((paths["model"], crop_type))
+        positions.append(position)
+
+    if items:
+        for position, (disease_id, confidence, error) in zip(positions, engine.run_batch(items)):
+            results[position] = (disease_id, confidence, error, results[position][3])
+    return results, time.perf_counter() - started
+
+def run_worker(processes: int = DETECTION_WORKER_PROCESSES):
+    """
+    Poll the detection queue and run micro-batches in a process pool until stopped.
+
+    Batches are claimed only when a process is free, so the queue stays the
+    source of truth and unclaimed work is picked up by any other worker.
+    If a process dies (e.g. killed for memory on a huge image) the pool is
+    broken: the batches it was running count as failed attempts and a new
+    pool is started.
+    """
+    # numpy/PIL come with the inference module; the API imports this module only for queue_depth
+    from .inference import INFERENCE_MAX_BATCH_SIZE, INFERENCE_MAX_WAIT_MS, InferenceStats
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        print("Detection worker stopping after in-flight jobs finish...")
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    running: Dict[Future, List[Tuple[int, str, Optional[str]]]] = {}
+    stats = InferenceStats(INFERENCE_MAX_BATCH_SIZE)
+    last_stale_check = 0.0
+    last_stats_report = time.monotonic()
+    print(f"Detection worker started with {processes} processes (batch size {INFERENCE_MAX_BATCH_SIZE}, max wait {INFERENCE_MAX_WAIT_MS:g} ms)")
+
+    def start_pool() -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=processes, initializer=_init_worker_process)
+
+    pool = start_pool()
+    pool_broken = False
+    try:
+        while not stopping or running:
+            db = SessionLocal()
+            try:
+                if time.monotonic() - last_stale_check > DETECTION_RUNNING_TIMEOUT_SECONDS / 2:
+                    requeued, failed = requeue_stale_jobs(db)
+                    if requeued:
+                        print(f"Requeued {requeued} stale detection jobs")
+                    if failed:
+                        print(f"Marked {failed} stale detection jobs as failed after {DETECTION_MAX_ATTEMPTS} attempts")
+                    last_stale_check = time.monotonic()
+
+                while len(running) < processes and not stopping and not pool_broken:
+                    jobs = claim_batch(db, INFERENCE_MAX_BATCH_SIZE, INFERENCE_MAX_WAIT_MS)
+                    if not jobs:
+                        break
+                    try:
+                        running[pool.submit(run_detection_batch, jobs)] = jobs
+                    except BrokenProcessPool:
+                        # The batch never started, so it does not use up an attempt
+                        release_jobs(db, [job[0] for job in jobs])
+                        pool_broken = True
+
+                if running:
+                    done, _ = wait(list(running), timeout=DETECTION_POLL_INTERVAL_SECONDS, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        jobs = running.pop(future)
+                        try:
+                            results, seconds = future.result()
+                        except Exception as e:
+                            error = str(e)
+                            if isinstance(e, BrokenProcessPool):
+                                pool_broken = True
+                                error = f"Worker process died: {error}"
+                            print(f"Error processing detection batch {[job[0] for job in jobs]}: {error}")
+                            for detection_id, _, _ in jobs:
+                                fail_job(db, detection_id, error)
+                            continue
+
+                        stats.record(len(jobs), 1, seconds)
+                        for (detection_id, _, _), (disease_id, confidence, error, thumbnails) in zip(jobs, results):
+                            if error:
+                                print(f"Error processing detection {detection_id}: {error}")
+                                fail_job(db, detection_id, error)
+                            else:
+                                complete_job(db, detection_id, disease_id, confidence, thumbnails)
+                else:
+                    time.sleep(DETECTION_POLL_INTERVAL_SECONDS)
+
+                # Every batch still running in a broken pool fails with it; once all
+                # of them have been recorded as failed attempts, replace the pool
+                if pool_broken and not running and not stopping:
+                    print("Detection worker process died; starting a new process pool")
+                    pool.shutdown(wait=False)
+                    pool = start_pool()
+                    pool_broken = False
+
+                if stats.batches and time.monotonic() - last_stats_report > DETECTION_STATS_INTERVAL_SECONDS:
+                    print(f"Inference stats: {stats.as_dict()}")
+                    last_stats_report = time.monotonic()
+            except Exception as e:
+                db.rollback()
+                print(f"Detection worker error: {str(e)}")
+                time.sleep(DETECTION_POLL_INTERVAL_SECONDS)
+            finally:
+                db.close()
+    finally:
+        pool.shutdown()
+
+    print(f"Inference stats: {stats.as_dict()}")
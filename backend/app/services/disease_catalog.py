@@ -0,0 +1,97 @@
+# services/disease_catalog.py
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from ..db import REPLICA_MAX_LAG_SECONDS
+from ..models.disease_detection import CropDisease
+
+# The catalog changes rarely; this bounds staleness for writes made by other processes
+DISEASE_CATALOG_TTL_SECONDS = float(os.getenv("DISEASE_CATALOG_TTL_SECONDS", "300"))
+
+class DiseaseCatalog:
+    """
+    Immutable snapshot of the CropDisease table.
+
+    Rows are plain dicts (safe to share between requests and threads),
+    indexed by id and by crop_type. `version` is a hash of the content, so
+    every process serving the same data reports the same ETag.
+    """
+
+    def __init__(self, diseases: List[Dict[str, Any]]):
+        self.diseases = diseases
+        self.by_id: Dict[int, Dict[str, Any]] = {disease["id"]: disease for disease in diseases}
+        self.by_crop_type: Dict[str, List[Dict[str, Any]]] = {}
+        for disease in diseases:
+            self.by_crop_type.setdefault(disease["crop_type"], []).append(disease)
+
+        # Disease name -> {crop_type: disease_id}, for resolving model labels
+        self.labels: Dict[str, Dict[str, int]] = {}
+        for disease in diseases:
+            self.labels.setdefault(disease["name"], {}).setdefault(disease["crop_type"], disease["id"])
+
+        content = json.dumps(diseases, sort_keys=True, default=str).encode()
+        self.version = hashlib.sha256(content).hexdigest()[:16]
+        self.etag = f'"{self.version}"'
+        self.built_at = time.monotonic()
+
+    @classmethod
+    def load(cls, db: Session) -> "DiseaseCatalog":
+        columns = CropDisease.__table__.columns
+        rows = db.query(*columns).order_by(CropDisease.id).all()
+        return cls([{column.name: value for column, value in zip(columns, row)} for row in rows])
+
+    def filter(self, crop_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        if crop_type:
+            return self.by_crop_type.get(crop_type, [])
+        return self.diseases
+
+class DiseaseCatalogCache:
+    """
+    Holds the current DiseaseCatalog for this process.
+
+    Rebuilt lazily after invalidate() (called by create_disease) or once it
+    is older than ttl_seconds. Shortly after an invalidation a snapshot read
+    from a replica session may predate the change, so it is served but not
+    kept.
+    """
+
+    def __init__(self, ttl_seconds: float, replica_grace_seconds: float = REPLICA_MAX_LAG_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self.replica_grace_seconds = replica_grace_seconds
+        self._catalog: Optional[DiseaseCatalog] = None
+        self._invalidated_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def get(self, db: Session) -> DiseaseCatalog:
+        catalog = self._catalog
+        if catalog is not None and time.monotonic() - catalog.built_at < self.ttl_seconds:
+            return catalog
+
+        with self._lock:
+            catalog = self._catalog
+            if catalog is None or time.monotonic() - catalog.built_at >= self.ttl_seconds:
+                catalog = DiseaseCatalog.load(db)
+                if not (db.info.get("replica") and time.monotonic() - self._invalidated_at < self.replica_grace_seconds):
+                    self._catalog = catalog
+            return catalog
+
+    def invalidate(self):
+        self._invalidated_at = time.monotonic()
+        self._catalog = None
+
+disease_catalog = DiseaseCatalogCache(ttl_seconds=DISEASE_CATALOG_TTL_SECONDS)
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches the ETag (weak comparison)"""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or any(
+        (candidate[2:] if candidate.startswith("W/") else candidate) == etag for candidate in candidates
+    )
@@ -0,0 +1,352 @@
+# services/geo.py
+import math
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Iterator, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..models.location import AgriService
+
+# numpy is imported where distances are computed, so that importing this
+# module (e.g. for encode_geohash) does not load it in every API worker
+if TYPE_CHECKING:
+    import numpy as np
+
+# Mean Earth radius and length of one degree of latitude on that sphere, in
+# kilometers; bounding boxes must use the same sphere as haversine_km
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = EARTH_RADIUS_KM * math.pi / 180
+
+# Bounding boxes are widened by this factor so rounding never drops a point
+# that haversine_km places on the edge of the radius
+BOUNDING_BOX_MARGIN = 1.001
+
+# Precision stored on AgriService rows (~150 m x 150 m cells)
+GEOHASH_PRECISION = 7
+
+# In-memory coordinate snapshot used by nearby lookups
+GEO_SNAPSHOT_ENABLED = os.getenv("GEO_SNAPSHOT_ENABLED", "true").lower() == "true"
+GEO_SNAPSHOT_TTL_SECONDS = float(os.getenv("GEO_SNAPSHOT_TTL_SECONDS", "60"))
+
+# Upper bound on the (queries x services) distance block held in memory at once
+BULK_BLOCK_ELEMENTS = int(os.getenv("GEO_BULK_BLOCK_ELEMENTS", str(4_000_000)))
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+def encode_geohash(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    """
+    Encode a coordinate as a geohash string.
+
+    Nearby points share a common prefix, so an indexed geohash column
+    can be range-scanned with LIKE 'prefix%' to find candidates in a cell.
+    """
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    geohash = []
+    bits = 0
+    bit_count = 0
+    even = True
+
+    while len(geohash) < precision:
+        if even:
+            mid = (lon_range[0] + lon_range[1]) / 2
+            if longitude >= mid:
+                bits = (bits << 1) | 1
+                lon_range[0] = mid
+            else:
+                bits = bits << 1
+                lon_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                bits = (bits << 1) | 1
+                lat_range[0] = mid
+            else:
+                bits = bits << 1
+                lat_range[1] = mid
+        even = not even
+        bit_count += 1
+
+        if bit_count == 5:
+            geohash.append(_BASE32[bits])
+            bits = 0
+            bit_count = 0
+
+    return "".join(geohash)
+
+def geohash_cell_size(precision: int) -> Tuple[float, float]:
+    """Return the (latitude, longitude) size in degrees of a geohash cell."""
+    total_bits = 5 * precision
+    lon_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (2 ** lat_bits), 360.0 / (2 ** lon_bits)
+
+def bounding_box(latitude: float, longitude: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """
+    Return (min_lat, max_lat, min_lon, max_lon) enclosing a circle of radius_km.
+
+    The box is clamped to valid coordinates; when the circle reaches a pole
+    the longitude span widens to the full range.
+    """
+    angular = radius_km * BOUNDING_BOX_MARGIN / EARTH_RADIUS_KM
+    delta_lat = math.degrees(angular)
+    if abs(latitude) + delta_lat >= 90.0:
+        delta_lon = 180.0
+    else:
+        # Widest longitude reached by the circle, which lies poleward of its center
+        delta_lon = min(180.0, math.degrees(math.asin(math.sin(angular) / math.cos(math.radians(latitude)))))
+
+    return (
+        max(-90.0, latitude - delta_lat),
+        min(90.0, latitude + delta_lat),
+        max(-180.0, longitude - delta_lon),
+        min(180.0, longitude + delta_lon),
+    )
+
+def geohash_prefixes_for_box(
+    min_lat: float,
+    max_lat: float,
+    min_lon: float,
+    max_lon: float,
+    max_precision: int = GEOHASH_PRECISION
+) -> List[str]:
+    """
+    Return geohash prefixes whose cells together cover the bounding box.
+
+    We pick the finest precision whose cells are at least as large as the
+    box, so the box overlaps at most a 2x2 block of cells and its four
+    corners identify every one of them. An empty list means the box is too
+    large for a prefix filter to be useful.
+    """
+    box_lat = max_lat - min_lat
+    box_lon = max_lon - min_lon
+
+    precision = 0
+    for candidate in range(max_precision, 0, -1):
+        cell_lat, cell_lon = geohash_cell_size(candidate)
+        if cell_lat >= box_lat and cell_lon >= box_lon:
+            precision = candidate
+            break
+
+    if precision == 0:
+        return []
+
+    prefixes: Set[str] = set()
+    for lat in (min_lat, max_lat):
+        for lon in (min_lon, max_lon):
+            prefixes.add(encode_geohash(lat, lon, precision))
+    return sorted(prefixes)
+
+def haversine_km(latitude: float, longitude: float, latitudes: "np.ndarray", longitudes: "np.ndarray") -> "np.ndarray":
+    """
+    Great-circle distance in kilometers from one point to many points.
+
+    latitudes/longitudes are arrays in degrees; the whole batch is computed
+    in a single vectorized pass.
+    """
+    import numpy as np
+
+    lat1 = math.radians(latitude)
+    lon1 = math.radians(longitude)
+    lat2 = np.radians(latitudes)
+    lon2 = np.radians(longitudes)
+
+    sin_dlat = np.sin((lat2 - lat1) / 2.0)
+    sin_dlon = np.sin((lon2 - lon1) / 2.0)
+    a = sin_dlat ** 2 + math.cos(lat1) * np.cos(lat2) * sin_dlon ** 2
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+def unit_vectors(latitudes: "np.ndarray", longitudes: "np.ndarray") -> "np.ndarray":
+    """Convert coordinates in degrees to (N, 3) points on the unit sphere"""
+    import numpy as np
+
+    lat = np.radians(latitudes)
+    lon = np.radians(longitudes)
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)))
+
+def nearest_indices(distances: "np.ndarray", k: int) -> "np.ndarray":
+    """Indices of the k smallest distances, sorted nearest first"""
+    import numpy as np
+
+    if k <= 0 or distances.size == 0:
+        return np.empty(0, dtype=np.intp)
+    if k < distances.size:
+        candidates = np.argpartition(distances, k - 1)[:k]
+    else:
+        candidates = np.arange(distances.size)
+    return candidates[np.argsort(distances[candidates], kind="stable")]
+
+class ServiceSnapshot:
+    """
+    Array-backed copy of the coordinates of all active AgriService rows.
+
+    Only id/latitude/longitude/service_type are loaded, so building it is a
+    single narrow query with no ORM hydration.
+    """
+
+    def __init__(self, ids: "np.ndarray", latitudes: "np.ndarray", longitudes: "np.ndarray", service_types: "np.ndarray"):
+        self.ids = ids
+        self.latitudes = latitudes
+        self.longitudes = longitudes
+        self.service_types = service_types
+        self.built_at = time.monotonic()
+        self._vectors: "Optional[np.ndarray]" = None
+
+    @property
+    def vectors(self) -> "np.ndarray":
+        """Unit-sphere coordinates of every service, computed on first use"""
+        if self._vectors is None:
+            self._vectors = unit_vectors(self.latitudes, self.longitudes)
+        return self._vectors
+
+    @classmethod
+    def load(cls, db: Session) -> "ServiceSnapshot":
+        import numpy as np
+
+        rows = db.query(
+            AgriService.id,
+            AgriService.latitude,
+            AgriService.longitude,
+            AgriService.service_type
+        ).filter(
+            AgriService.is_active == True,
+            AgriService.latitude != None,
+            AgriService.longitude != None
+        ).all()
+
+        return cls(
+            ids=np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows)),
+            latitudes=np.fromiter((row[1] for row in rows), dtype=np.float64, count=len(rows)),
+            longitudes=np.fromiter((row[2] for row in rows), dtype=np.float64, count=len(rows)),
+            service_types=np.array([row[3] or "" for row in rows], dtype=object),
+        )
+
+    def __len__(self) -> int:
+        return int(self.ids.size)
+
+    def nearby(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_km: float,
+        service_type: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> "Tuple[np.ndarray, np.ndarray]":
+        """
+        Return (ids, distances_km) of services within radius_km, nearest first.
+
+        A cheap bounding-box mask discards most rows before the haversine
+        pass; argpartition then selects the top `limit` without a full sort.
+        """
+        import numpy as np
+
+        min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, radius_km)
+        mask = (
+            (self.latitudes >= min_lat) & (self.latitudes <= max_lat) &
+            (self.longitudes >= min_lon) & (self.longitudes <= max_lon)
+        )
+        if service_type:
+            mask &= self.service_types == service_type
+
+        candidates = np.flatnonzero(mask)
+        distances = haversine_km(latitude, longitude, self.latitudes[candidates], self.longitudes[candidates])
+
+        within = distances <= radius_km
+        candidates = candidates[within]
+        distances = distances[within]
+
+        order = nearest_indices(distances, distances.size if limit is None else limit)
+        return self.ids[candidates[order]], distances[order]
+
+    def nearest_many(
+        self,
+        latitudes: Sequence[float],
+        longitudes: Sequence[float],
+        service_type: str,
+        k: int = 1,
+        max_distance_km: Optional[float] = None
+    ) -> "Iterator[Tuple[int, np.ndarray, np.ndarray]]":
+        """
+        Find the k nearest services of one type for many query points.
+
+        Yields (query_index, ids, distances_km) in query order. Points are
+        compared on the unit sphere, where the nearest service is the one
+        with the largest dot product, so each block of queries is answered
+        by a single matrix multiplication against the services of that type.
+        Blocks are sized to keep memory bounded by BULK_BLOCK_ELEMENTS.
+        """
+        import numpy as np
+
+        type_indices = np.flatnonzero(self.service_types == service_type)
+        queries = unit_vectors(np.asarray(latitudes, dtype=np.float64), np.asarray(longitudes, dtype=np.float64))
+
+        if type_indices.size == 0:
+            for query_index in range(len(queries)):
+                yield query_index, self.ids[:0], np.empty(0)
+            return
+
+        services = self.vectors[type_indices]
+        k = min(k, type_indices.size)
+        block_size = max(1, BULK_BLOCK_ELEMENTS // type_indices.size)
+
+        for start in range(0, len(queries), block_size):
+            dots = queries[start:start + block_size] @ services.T
+            if k < type_indices.size:
+                top = np.argpartition(-dots, k - 1, axis=1)[:, :k]
+            else:
+                top = np.broadcast_to(np.arange(type_indices.size), (dots.shape[0], k))
+            top_dots = np.take_along_axis(dots, top, axis=1)
+            order = np.argsort(-top_dots, axis=1, kind="stable")
+            top = np.take_along_axis(top, order, axis=1)
+            top_distances = EARTH_RADIUS_KM * np.arccos(np.clip(np.take_along_axis(top_dots, order, axis=1), -1.0, 1.0))
+
+            for row in range(dots.shape[0]):
+                distances = top_distances[row]
+                indices = type_indices[top[row]]
+                if max_distance_km is not None:
+                    within = distances <= max_distance_km
+                    distances = distances[within]
+                    indices = indices[within]
+                yield start + row, self.ids[indices], distances
+
+class ServiceSnapshotCache:
+    """
+    Holds the current ServiceSnapshot for this process.
+
+    The snapshot is rebuilt lazily after invalidate() (called by the
+    AgriConnect write routes) or once it is older than ttl_seconds, which
+    bounds staleness for writes handled by other workers.
+
+    invalidate() bumps a generation counter; a rebuild that was already
+    loading when it was called returns its result to its own caller but
+    does not keep it, since it may predate the write.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._snapshot: Optional[ServiceSnapshot] = None
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, db: Session) -> ServiceSnapshot:
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - snapshot.built_at < self.ttl_seconds:
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or time.monotonic() - snapshot.built_at >= self.ttl_seconds:
+                generation = self._generation
+                snapshot = ServiceSnapshot.load(db)
+                if generation == self._generation:
+                    self._snapshot = snapshot
+            return snapshot
+
+    def invalidate(self):
+        self._generation += 1
+        self._snapshot = None
+
+service_snapshot = ServiceSnapshotCache(ttl_seconds=GEO_SNAPSHOT_TTL_SECONDS)
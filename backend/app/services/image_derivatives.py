@@ -0,0 +1,64 @@
+# services/image_derivatives.py
+import os
+from typing import Dict, Sequence, Tuple
+
+from PIL import Image, ImageOps, features
+
+# Longest-edge sizes of the thumbnails served to the apps
+AGRISCAN_THUMBNAIL_SIZES = tuple(
+    int(size) for size in os.getenv("AGRISCAN_THUMBNAIL_SIZES", "128,512").split(",") if size.strip()
+)
+AGRISCAN_THUMBNAIL_QUALITY = int(os.getenv("AGRISCAN_THUMBNAIL_QUALITY", "80"))
+# WebP is about a third smaller than JPEG at the same quality; fall back when Pillow lacks it
+THUMBNAIL_FORMAT, THUMBNAIL_EXTENSION = ("WEBP", ".webp") if features.check("webp") else ("JPEG", ".jpg")
+
+def derivative_names(image_path: str, input_size: Tuple[int, int], sizes: Sequence[int] = AGRISCAN_THUMBNAIL_SIZES) -> Dict[str, str]:
+    """
+    File names of an upload's derivatives, stored next to the original.
+
+    Keys are the thumbnail sizes as strings plus "model" for the
+    model-input-sized image. Uploads are content-addressed, so the names
+    are stable for identical images.
+    """
+    stem = os.path.splitext(os.path.basename(image_path))[0]
+    names = {str(size): f"{stem}_{size}{THUMBNAIL_EXTENSION}" for size in sizes}
+    names["model"] = f"{stem}_model_{input_size[0]}x{input_size[1]}.png"
+    return names
+
+def build_derivatives(image_path: str, input_size: Tuple[int, int], sizes: Sequence[int] = AGRISCAN_THUMBNAIL_SIZES) -> Dict[str, str]:
+    """
+    Write the thumbnails and model-input image for an upload.
+
+    The original is decoded once: draft() lets the JPEG decoder scale down
+    while decoding to just above the largest size needed, and each smaller
+    output is made from the previous one with reduce()-backed resampling
+    (reducing_gap). Existing derivatives are kept. Returns the paths by key.
+    """
+    folder = os.path.dirname(image_path)
+    names = derivative_names(image_path, input_size, sizes)
+    paths = {key: os.path.join(folder, name) for key, name in names.items()}
+    if all(os.path.exists(path) for path in paths.values()):
+        return paths
+
+    largest = max(list(sizes) + list(input_size))
+    with Image.open(image_path) as image:
+        image.draft("RGB", (largest, largest))
+        # Phone cameras store rotation in EXIF; bake it in before resizing
+        image = ImageOps.exif_transpose(image).convert("RGB")
+
+    model_input = image.resize(input_size, Image.BILINEAR, reducing_gap=2.0)
+    _save_atomic(model_input, paths["model"], "PNG")
+
+    thumbnail = image
+    for size in sorted(sizes, reverse=True):
+        thumbnail = thumbnail.copy()
+        thumbnail.thumbnail((size, size), Image.LANCZOS, reducing_gap=2.0)
+        _save_atomic(thumbnail, paths[str(size)], THUMBNAIL_FORMAT, quality=AGRISCAN_THUMBNAIL_QUALITY)
+
+    return paths
+
+def _save_atomic(image: Image.Image, path: str, image_format: str, **params):
+    # Another worker may be writing the same content-addressed file
+    temp_path = f"{path}.{os.getpid()}.part"
+    image.save(temp_path, image_format, **params)
+    os.replace(temp_path, path)
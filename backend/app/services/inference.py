@@ -0,0 +1,182 @@
+# services/inference.py
+import importlib
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image
+
+# Micro-batching settings used by the detection worker
+INFERENCE_MAX_BATCH_SIZE = int(os.getenv("INFERENCE_MAX_BATCH_SIZE", "16"))
+INFERENCE_MAX_WAIT_MS = float(os.getenv("INFERENCE_MAX_WAIT_MS", "50"))
+# "package.module:factory" returning a DiseaseModel; the dummy model is used when unset
+AGRISCAN_MODEL = os.getenv("AGRISCAN_MODEL")
+
+# Label a model uses for a leaf with no disease
+HEALTHY_LABEL = "healthy"
+
+# ImageNet statistics, the usual normalization for CNN classifiers
+IMAGE_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+IMAGE_STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+
+class DiseaseModel(ABC):
+    """
+    Interface for crop-disease classifiers.
+
+    `labels` are disease names (matching CropDisease.name) plus optionally
+    HEALTHY_LABEL. predict() takes a normalized float32 batch of shape
+    (N, height, width, 3) and returns class probabilities of shape
+    (N, len(labels)).
+    """
+    labels: List[str] = []
+    input_size: Tuple[int, int] = (224, 224)
+
+    @abstractmethod
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        """Class probabilities, shape (N, len(labels)), for a preprocessed batch"""
+
+class DummyDiseaseModel(DiseaseModel):
+    """
+    Deterministic stand-in for a trained model, for development and tests.
+
+    It projects simple colour statistics of each image through a fixed
+    random matrix and applies a softmax, so the same image always gets the
+    same answer and one forward pass handles the whole batch.
+    """
+
+    def __init__(self, labels: Sequence[str], seed: int = 42):
+        self.labels = list(labels) + [HEALTHY_LABEL]
+        rng = np.random.default_rng(seed)
+        self._weights = rng.normal(size=(6, len(self.labels))).astype(np.float32)
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        features = np.concatenate([batch.mean(axis=(1, 2)), batch.std(axis=(1, 2))], axis=1)
+        logits = features @ self._weights * 4.0
+        logits -= logits.max(axis=1, keepdims=True)
+        probabilities = np.exp(logits)
+        return probabilities / probabilities.sum(axis=1, keepdims=True)
+
+def load_model(disease_names: Sequence[str]) -> DiseaseModel:
+    """Load the configured model, or the dummy model over the known diseases"""
+    if AGRISCAN_MODEL:
+        module_name, _, factory_name = AGRISCAN_MODEL.partition(":")
+        factory = getattr(importlib.import_module(module_name), factory_name or "load_model")
+        return factory()
+    return DummyDiseaseModel(disease_names)
+
+def load_image(image_path: str, size: Tuple[int, int]) -> np.ndarray:
+    """Decode an image as an RGB uint8 array of the given (width, height)"""
+    with Image.open(image_path) as image:
+        # draft() lets the JPEG decoder downscale while decoding, which is
+        # much cheaper than decoding the full camera resolution first
+        image.draft("RGB", size)
+        image = image.convert("RGB")
+        if image.size != size:
+            image = image.resize(size, Image.BILINEAR, reducing_gap=2.0)
+        return np.asarray(image, dtype=np.uint8)
+
+def preprocess_batch(images: Sequence[np.ndarray]) -> np.ndarray:
+    """Stack uint8 images and normalize the whole batch in one vectorized step"""
+    batch = np.stack(images).astype(np.float32) / 255.0
+    return (batch - IMAGE_MEAN) / IMAGE_STD
+
+class InferenceStats:
+    """Throughput and batch fill ratio over a series of micro-batches"""
+
+    def __init__(self, max_batch_size: int):
+        self.max_batch_size = max_batch_size
+        self.images = 0
+        self.batches = 0
+        self.busy_seconds = 0.0
+
+    def record(self, images: int, batches: int, seconds: float):
+        self.images += images
+        self.batches += batches
+        self.busy_seconds += seconds
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "images": self.images,
+            "batches": self.batches,
+            "images_per_second": round(self.images / self.busy_seconds, 2) if self.busy_seconds else 0.0,
+            "batch_fill_ratio": round(self.images / (self.batches * self.max_batch_size), 3) if self.batches else 0.0,
+        }
+
+class BatchInferenceEngine:
+    """
+    Runs one forward pass per micro-batch of images.
+
+    `catalog` maps disease name -> {crop_type: disease_id}. Predictions are
+    restricted to labels known for the item's crop type (any known label
+    when the crop type is not given); model labels missing from the catalog
+    are never returned.
+    """
+
+    def __init__(self, model: DiseaseModel, catalog: Dict[str, Dict[str, int]], max_batch_size: int = INFERENCE_MAX_BATCH_SIZE):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.stats = InferenceStats(max_batch_size)
+        self.update_catalog(catalog)
+
+    def update_catalog(self, catalog: Dict[str, Dict[str, int]]):
+        self.catalog = catalog
+        self._healthy = np.array([label == HEALTHY_LABEL for label in self.model.labels])
+        self._masks: Dict[Optional[str], np.ndarray] = {}
+
+    def _allowed_labels(self, crop_type: Optional[str]) -> np.ndarray:
+        mask = self._masks.get(crop_type)
+        if mask is None:
+            mask = np.array([
+                bool(self.catalog.get(label)) and (not crop_type or crop_type in self.catalog[label])
+                for label in self.model.labels
+            ]) | self._healthy
+            self._masks[crop_type] = mask
+        return mask
+
+    def _disease_id(self, label: str, crop_type: Optional[str]) -> int:
+        ids = self.catalog[label]
+        return ids[crop_type] if crop_type in ids else next(iter(ids.values()))
+
+    def run_batch(self, items: Sequence[Tuple[str, Optional[str]]]) -> List[Tuple[Optional[int], Optional[float], Optional[str]]]:
+        """
+        Classify (image_path, crop_type) items.
+
+        Returns one (disease_id, confidence, error) per item; an image that
+        cannot be decoded gets an error without failing the rest of the batch.
+        """
+        started = time.perf_counter()
+        results: List[Tuple[Optional[int], Optional[float], Optional[str]]] = [(None, None, None)] * len(items)
+
+        images = []
+        positions = []
+        for position, (image_path, _) in enumerate(items):
+            try:
+                images.append(load_image(image_path, self.model.input_size))
+                positions.append(position)
+            except Exception as e:
+                results[position] = (None, None, f"Could not read image: {str(e)}")
+
+        batches = 0
+        for start in range(0, len(images), self.max_batch_size):
+            chunk_positions = positions[start:start + self.max_batch_size]
+            probabilities = self.model.predict(preprocess_batch(images[start:start + self.max_batch_size]))
+            masks = np.stack([self._allowed_labels(items[position][1]) for position in chunk_positions])
+            scores = np.where(masks, probabilities, -1.0)
+            best = scores.argmax(axis=1)
+
+            for row, position in enumerate(chunk_positions):
+                label_index = int(best[row])
+                if self._healthy[label_index] or scores[row, label_index] < 0:
+                    continue
+                label = self.model.labels[label_index]
+                results[position] = (
+                    self._disease_id(label, items[position][1]),
+                    round(float(scores[row, label_index]), 4),
+                    None
+                )
+            batches += 1
+
+        self.stats.record(len(images), batches, time.perf_counter() - started)
+        return results
@@ -0,0 +1,109 @@
+# services/password_hasher.py
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from passlib.context import CryptContext
+
+from ..utils.timing import percentile_ms
+
+# bcrypt releases the GIL, so threads hash in parallel up to the core count.
+# 0 runs hashing inline on the caller (blocking the event loop; for comparison only)
+PASSWORD_HASH_THREADS = int(os.getenv("PASSWORD_HASH_THREADS", str(os.cpu_count() or 1)))
+# Hash/verify calls admitted at once (running plus queued); beyond this callers get PasswordHasherBusy
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", str(max(PASSWORD_HASH_THREADS, 1) * 32)))
+# Recent queue times kept for the percentiles in stats()
+PASSWORD_HASH_STATS_WINDOW = int(os.getenv("PASSWORD_HASH_STATS_WINDOW", "1000"))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many hash/verify calls are already pending"""
+
+class PasswordHasher:
+    """
+    Runs bcrypt hashing and verification on a bounded thread pool.
+
+    Each call costs 100-300 ms of CPU; run inline in an async route it stalls
+    every other request on the worker. Here at most `threads` calls run at
+    once and at most `max_pending` are admitted; the time each call waits
+    for a thread is recorded as its queue time.
+    """
+
+    def __init__(self, context: CryptContext, threads: int, max_pending: int, stats_window: int):
+        self.context = context
+        self.threads = threads
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="password-hash") if threads > 0 else None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._queue_times = deque(maxlen=stats_window)
+        self._hash_seconds = deque(maxlen=stats_window)
+        self.completed = 0
+        self.rejected = 0
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.context.hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run(self.context.verify, password, hashed_password)
+
+    async def _run(self, function: Callable[..., Any], *args) -> Any:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordHasherBusy()
+            self._pending += 1
+
+        submitted = time.perf_counter()
+        try:
+            if self._executor is None:
+                return self._timed(submitted, function, *args)
+            return await asyncio.get_running_loop().run_in_executor(self._executor, self._timed, submitted, function, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def _timed(self, submitted: float, function: Callable[..., Any], *args) -> Any:
+        started = time.perf_counter()
+        try:
+            return function(*args)
+        finally:
+            finished = time.perf_counter()
+            with self._lock:
+                self._queue_times.append(started - submitted)
+                self._hash_seconds.append(finished - started)
+                self.completed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            queue_times = sorted(self._queue_times)
+            hash_seconds = sorted(self._hash_seconds)
+            pending = self._pending
+
+        return {
+            "threads": self.threads,
+            "max_pending": self.max_pending,
+            "pending": pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "queue_ms_p50": percentile_ms(queue_times, 0.5),
+            "queue_ms_p95": percentile_ms(queue_times, 0.95),
+            "queue_ms_max": percentile_ms(queue_times, 1.0),
+            "hash_ms_p50": percentile_ms(hash_seconds, 0.5),
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+password_hasher = PasswordHasher(
+    pwd_context,
+    threads=PASSWORD_HASH_THREADS,
+    max_pending=PASSWORD_HASH_MAX_PENDING,
+    stats_window=PASSWORD_HASH_STATS_WINDOW
+)
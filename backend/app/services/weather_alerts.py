@@ -0,0 +1,202 @@
+# services/weather_alerts.py
+import asyncio
+import os
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from ..db import SessionLocal
+from ..models.weather import UserWeatherAlert, UserWeatherPreference, WeatherAlert
+from .weather_cache import quantize_location
+from .weather_prefetch import RateLimiter, WEATHER_API_RATE_LIMIT_PER_MINUTE, resolve_location
+from .weather_service import get_weather_data
+
+# Only one worker (or a cron job) should run the evaluation loop
+WEATHER_ALERTS_ENABLED = os.getenv("WEATHER_ALERTS_ENABLED", "false").lower() == "true"
+WEATHER_ALERTS_INTERVAL_SECONDS = float(os.getenv("WEATHER_ALERTS_INTERVAL_SECONDS", "1800"))
+WEATHER_ALERTS_CONCURRENCY = int(os.getenv("WEATHER_ALERTS_CONCURRENCY", "8"))
+
+ALERT_SEVERITY = {
+    "heavy_rain": "high",
+    "high_temperature": "high",
+}
+
+def load_subscriptions() -> List[Dict[str, Any]]:
+    """Active weather preferences as plain dicts (id, user, location, types, method)"""
+    db = SessionLocal()
+    try:
+        rows = db.query(
+            UserWeatherPreference.id,
+            UserWeatherPreference.user_id,
+            UserWeatherPreference.location,
+            UserWeatherPreference.alert_types,
+            UserWeatherPreference.notification_method
+        ).filter(
+            UserWeatherPreference.is_active == True,
+            UserWeatherPreference.location != None
+        ).all()
+        return [
+            {
+                "id": row.id,
+                "user_id": row.user_id,
+                "location": row.location,
+                "alert_types": set(row.alert_types or []),
+                "notification_method": row.notification_method,
+            }
+            for row in rows
+        ]
+    finally:
+        db.close()
+
+def store_cell_alerts(
+    cell_key: str,
+    location: str,
+    alerts: List[Dict[str, Any]],
+    subscribers: List[Dict[str, Any]]
+) -> Tuple[int, int, int]:
+    """
+    Persist the current alerts for one cell and fan new ones out.
+
+    An alert type that is already active for the cell is kept as is, so
+    subscribers are notified once per weather event rather than once per
+    evaluation. Active alerts that no longer apply are closed. Returns
+    (created, resolved, notifications).
+    """
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        active = {
+            alert.alert_type: alert
+            for alert in db.query(WeatherAlert).filter(
+                WeatherAlert.cell_key == cell_key,
+                WeatherAlert.is_active == True
+            ).all()
+        }
+        current = {alert["type"]: alert for alert in alerts}
+
+        resolved = 0
+        for alert_type, alert in active.items():
+            if alert_type not in current:
+                alert.is_active = False
+                alert.end_time = now
+                resolved += 1
+
+        new_alerts = []
+        for alert_type, alert in current.items():
+            if alert_type in active:
+                continue
+            db_alert = WeatherAlert(
+                alert_type=alert_type,
+                severity=ALERT_SEVERITY.get(alert_type, "medium"),
+                message=alert["message"],
+                cell_key=cell_key,
+                location=location,
+                start_time=now,
+                is_active=True
+            )
+            db.add(db_alert)
+            new_alerts.append(db_alert)
+        db.flush()
+
+        notifications = [
+            UserWeatherAlert(
+                user_id=subscriber["user_id"],
+                alert_id=db_alert.id,
+                preference_id=subscriber["id"],
+                notification_method=subscriber["notification_method"],
+                status="pending"
+            )
+            for db_alert in new_alerts
+            for subscriber in subscribers
+            # An empty alert_types list means "all alert types"
+            if not subscriber["alert_types"] or db_alert.alert_type in subscriber["alert_types"]
+        ]
+        db.add_all(notifications)
+        db.commit()
+        return len(new_alerts), resolved, len(notifications)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+async def evaluate_weather_alerts(subscriptions: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    Evaluate weather alerts once per location cell and fan them out.
+
+    Subscriptions are grouped into an index of cell -> subscribers, each
+    cell's alerts are computed from the (cached) forecast exactly once, and
+    only newly raised alerts are delivered to that cell's subscribers. Cost
+    grows with the number of distinct cells, not the number of users.
+    """
+    started = time.monotonic()
+    if subscriptions is None:
+        subscriptions = await run_in_threadpool(load_subscriptions)
+
+    limiter = RateLimiter(WEATHER_API_RATE_LIMIT_PER_MINUTE)
+    semaphore = asyncio.Semaphore(WEATHER_ALERTS_CONCURRENCY)
+    report = {
+        "subscriptions": len(subscriptions),
+        "cells": 0,
+        "alerts_created": 0,
+        "alerts_resolved": 0,
+        "notifications": 0,
+        "failed": 0,
+        "unresolved_locations": 0,
+    }
+
+    by_location: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for subscription in subscriptions:
+        by_location[subscription["location"].strip()].append(subscription)
+
+    async def resolve(location: str):
+        async with semaphore:
+            try:
+                return await resolve_location(location, limiter)
+            except Exception as e:
+                print(f"Could not geocode {location}: {str(e)}")
+                return None
+
+    locations = list(by_location)
+    cells: Dict[str, Dict[str, Any]] = {}
+    for location, coordinates in zip(locations, await asyncio.gather(*[resolve(location) for location in locations])):
+        if coordinates is None:
+            report["unresolved_locations"] += 1
+            continue
+        cell_key, cell_lat, cell_lon = quantize_location(*coordinates)
+        cell = cells.setdefault(cell_key, {"lat": cell_lat, "lon": cell_lon, "location": location, "subscribers": []})
+        cell["subscribers"].extend(by_location[location])
+    report["cells"] = len(cells)
+
+    async def evaluate(cell_key: str, cell: Dict[str, Any]):
+        async with semaphore:
+            try:
+                weather_data = await get_weather_data(cell["lat"], cell["lon"])
+                alerts = weather_data["agricultural_advice"]["alerts"]
+                created, resolved, notifications = await run_in_threadpool(
+                    store_cell_alerts, cell_key, cell["location"], alerts, cell["subscribers"]
+                )
+                report["alerts_created"] += created
+                report["alerts_resolved"] += resolved
+                report["notifications"] += notifications
+            except Exception as e:
+                print(f"Error evaluating weather alerts for cell {cell_key}: {str(e)}")
+                report["failed"] += 1
+
+    await asyncio.gather(*[evaluate(key, cell) for key, cell in cells.items()])
+
+    report["duration_seconds"] = round(time.monotonic() - started, 2)
+    print(f"Weather alert evaluation finished: {report}")
+    return report
+
+async def evaluate_weather_alerts_forever(interval: float = WEATHER_ALERTS_INTERVAL_SECONDS):
+    """Run evaluate_weather_alerts periodically; run as a background task"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await evaluate_weather_alerts()
+        except Exception as e:
+            print(f"Weather alert evaluation failed: {str(e)}")
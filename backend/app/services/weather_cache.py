@@ -0,0 +1,196 @@
+# services/weather_cache.py
+import asyncio
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+# Forecasts are shared by every request that falls in the same grid cell
+WEATHER_CACHE_CELL_DEGREES = float(os.getenv("WEATHER_CACHE_CELL_DEGREES", "0.01"))
+WEATHER_CACHE_TTL_SECONDS = float(os.getenv("WEATHER_CACHE_TTL_SECONDS", "600"))
+WEATHER_CACHE_STALE_SECONDS = float(os.getenv("WEATHER_CACHE_STALE_SECONDS", "1800"))
+WEATHER_CACHE_MAX_ENTRIES = int(os.getenv("WEATHER_CACHE_MAX_ENTRIES", "2048"))
+
+# Background refresh of the most requested ("hot") cells before they expire
+WEATHER_REFRESH_INTERVAL_SECONDS = float(os.getenv("WEATHER_REFRESH_INTERVAL_SECONDS", "60"))
+WEATHER_REFRESH_HOT_CELLS = int(os.getenv("WEATHER_REFRESH_HOT_CELLS", "50"))
+
+def quantize_location(lat: float, lon: float, cell_degrees: float = WEATHER_CACHE_CELL_DEGREES) -> Tuple[str, float, float]:
+    """
+    Snap a coordinate to its grid cell.
+
+    Returns (cell_key, cell_lat, cell_lon) where cell_lat/cell_lon is the
+    cell center that is actually sent upstream, so every request in the
+    cell gets the same forecast.
+    """
+    # The epsilon keeps values like 18.52 / 0.01 from landing in the cell below
+    lat_index = math.floor(lat / cell_degrees + 1e-9)
+    lon_index = math.floor(lon / cell_degrees + 1e-9)
+    cell_lat = round((lat_index + 0.5) * cell_degrees, 6)
+    cell_lon = round((lon_index + 0.5) * cell_degrees, 6)
+    return f"{cell_degrees:g}:{lat_index}:{lon_index}", cell_lat, cell_lon
+
+# Loads a value; returns (value, age in seconds)
+Fetch = Callable[[], Awaitable[Tuple[Any, float]]]
+
+class _Entry:
+    __slots__ = ("value", "fetched_at", "refresh", "hits")
+
+    def __init__(self, value: Any, fetched_at: float, refresh: Optional[Fetch] = None):
+        self.value = value
+        self.fetched_at = fetched_at
+        self.refresh = refresh
+        self.hits = 0
+
+class AsyncTTLCache:
+    """
+    In-process async cache with TTL, LRU eviction and stale-while-revalidate.
+
+    - Fresh entries (younger than ttl) are returned directly.
+    - Stale entries (younger than ttl + stale_ttl) are returned immediately
+      while a single background refresh replaces them.
+    - Concurrent misses for the same key share one in-flight fetch
+      (singleflight), so a burst of requests makes one upstream call.
+
+    Fetch functions return (value, age_seconds). A value loaded from a
+    shared store is as old as the store's copy, so it expires that much
+    sooner. Misses call `fetch`; background refreshes (stale hits and hot
+    cells) call `refresh`, which should go to the origin, since the value
+    being refreshed already came from the best copy `fetch` could find.
+
+    Failed fetches are never cached; a failed background refresh keeps
+    serving the stale value until it expires.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, stale_ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._inflight: Dict[str, "asyncio.Future[Any]"] = {}
+        self._stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "refresh_errors": 0,
+            "evictions": 0,
+            "hot_refreshes": 0,
+        }
+
+    async def get_or_fetch(self, key: str, fetch: Fetch, refresh: Optional[Fetch] = None) -> Any:
+        refresh = refresh or fetch
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry.fetched_at
+            entry.hits += 1
+            if age < self.ttl:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return entry.value
+            if age < self.ttl + self.stale_ttl:
+                self._entries.move_to_end(key)
+                self._stats["stale_hits"] += 1
+                if key not in self._inflight:
+                    self._start_fetch(key, refresh, refresh, background=True)
+                return entry.value
+
+        self._stats["misses"] += 1
+        task = self._inflight.get(key)
+        if task is not None:
+            self._stats["coalesced"] += 1
+        else:
+            task = self._start_fetch(key, fetch, refresh)
+        # shield() so one cancelled caller doesn't cancel the fetch for the others
+        return await asyncio.shield(task)
+
+    def set(self, key: str, value: Any, refresh: Optional[Fetch] = None, age: float = 0.0):
+        """Store a value that is `age` seconds old; `refresh` reloads it in the background"""
+        previous = self._entries.get(key)
+        entry = _Entry(value, time.monotonic() - max(0.0, age), refresh or (previous.refresh if previous else None))
+        # A new entry was requested at least once by the miss that fetched it
+        entry.hits = previous.hits if previous is not None else 1
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def invalidate(self, key: Optional[str] = None):
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def refresh_hot(self, limit: int, refresh_after: float = 0.8) -> int:
+        """
+        Start background refreshes for the most requested entries that are
+        past refresh_after * ttl, so hot cells never go stale for readers.
+
+        Hit counts are halved after every round so popularity decays.
+        Returns the number of refreshes started.
+        """
+        now = time.monotonic()
+        candidates = [
+            (key, entry) for key, entry in self._entries.items()
+            if entry.refresh is not None
+            and entry.hits > 0
+            and key not in self._inflight
+            and now - entry.fetched_at >= self.ttl * refresh_after
+        ]
+        candidates.sort(key=lambda item: item[1].hits, reverse=True)
+
+        for key, entry in candidates[:limit]:
+            self._start_fetch(key, entry.refresh, entry.refresh, background=True)
+            self._stats["hot_refreshes"] += 1
+
+        for entry in self._entries.values():
+            entry.hits //= 2
+        return min(limit, len(candidates))
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats, "entries": len(self._entries), "inflight": len(self._inflight)}
+
+    def _start_fetch(self, key: str, fetch: Fetch, refresh: Fetch, background: bool = False) -> "asyncio.Future[Any]":
+        task = asyncio.ensure_future(self._run_fetch(key, fetch, refresh))
+        self._inflight[key] = task
+        if background:
+            task.add_done_callback(lambda done: self._log_refresh_error(key, done))
+        return task
+
+    async def _run_fetch(self, key: str, fetch: Fetch, refresh: Fetch) -> Any:
+        try:
+            value, age = await fetch()
+            self.set(key, value, refresh, age)
+        finally:
+            self._inflight.pop(key, None)
+        if age >= self.ttl and refresh is not fetch:
+            # The shared copy was already stale; serve it once and refresh from the origin
+            self._start_fetch(key, refresh, refresh, background=True)
+        return value
+
+    def _log_refresh_error(self, key: str, task: "asyncio.Future[Any]"):
+        # Retrieve the exception so a failed refresh nobody awaited is not reported as unhandled
+        if task.cancelled() or task.exception() is None:
+            return
+        self._stats["refresh_errors"] += 1
+        print(f"Background refresh failed for weather cell {key}: {str(task.exception())}")
+
+weather_cache = AsyncTTLCache(
+    maxsize=WEATHER_CACHE_MAX_ENTRIES,
+    ttl=WEATHER_CACHE_TTL_SECONDS,
+    stale_ttl=WEATHER_CACHE_STALE_SECONDS,
+)
+
+async def refresh_hot_cells_forever(
+    interval: float = WEATHER_REFRESH_INTERVAL_SECONDS,
+    limit: int = WEATHER_REFRESH_HOT_CELLS
+):
+    """Periodically refresh hot weather cells; run as a background task"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            weather_cache.refresh_hot(limit)
+        except Exception as e:
+            print(f"Error refreshing hot weather cells: {str(e)}")
@@ -0,0 +1,202 @@
+# services/weather_prefetch.py
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from ..db import SessionLocal
+from ..models.user import User
+from ..models.weather import UserWeatherPreference
+from .http_client import get_http_client
+from .weather_cache import quantize_location, weather_cache
+from .weather_service import WEATHER_API_KEY, refresh_weather_cell
+from .weather_store import load_weather_snapshot
+
+# Only one worker (or a cron job) should run the scheduler
+WEATHER_PREFETCH_ENABLED = os.getenv("WEATHER_PREFETCH_ENABLED", "false").lower() == "true"
+# Local server time to start the daily prefetch, ahead of the morning peak
+WEATHER_PREFETCH_TIME = os.getenv("WEATHER_PREFETCH_TIME", "05:30")
+WEATHER_PREFETCH_CONCURRENCY = int(os.getenv("WEATHER_PREFETCH_CONCURRENCY", "8"))
+# OpenWeatherMap's free tier allows 60 calls/minute; stay below it
+WEATHER_API_RATE_LIMIT_PER_MINUTE = int(os.getenv("WEATHER_API_RATE_LIMIT_PER_MINUTE", "50"))
+# Cells fetched more recently than this are left alone
+WEATHER_PREFETCH_MIN_AGE_SECONDS = float(os.getenv("WEATHER_PREFETCH_MIN_AGE_SECONDS", "300"))
+
+GEOCODING_URL = "https://api.openweathermap.org/geo/1.0/direct"
+
+# Location name -> (lat, lon), or None when the name could not be geocoded
+_geocode_cache: Dict[str, Optional[Tuple[float, float]]] = {}
+
+class RateLimiter:
+    """Spaces out calls so no more than `rate_per_minute` start per minute"""
+
+    def __init__(self, rate_per_minute: int):
+        self.interval = 60.0 / max(1, rate_per_minute)
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+def collect_prefetch_locations(db: Session) -> List[str]:
+    """
+    Return the distinct locations farmers care about: every village/district
+    of registered users plus every active weather preference location.
+    """
+    locations = set()
+
+    for village, district in db.query(User.village, User.district).filter(
+        User.district != None
+    ).distinct().all():
+        if village:
+            locations.add(f"{village}, {district}")
+        locations.add(district)
+
+    for (location,) in db.query(UserWeatherPreference.location).filter(
+        UserWeatherPreference.is_active == True,
+        UserWeatherPreference.location != None
+    ).distinct().all():
+        locations.add(location)
+
+    return sorted(location.strip() for location in locations if location and location.strip())
+
+def parse_coordinates(location: str) -> Optional[Tuple[float, float]]:
+    """Accept locations stored as "lat,lon" without geocoding them"""
+    parts = location.split(",")
+    if len(parts) != 2:
+        return None
+    try:
+        lat, lon = float(parts[0]), float(parts[1])
+    except ValueError:
+        return None
+    if -90 <= lat <= 90 and -180 <= lon <= 180:
+        return lat, lon
+    return None
+
+async def resolve_location(location: str, limiter: RateLimiter) -> Optional[Tuple[float, float]]:
+    """Resolve a location name to coordinates, memoizing geocoder answers"""
+    coordinates = parse_coordinates(location)
+    if coordinates is not None:
+        return coordinates
+
+    if location in _geocode_cache:
+        return _geocode_cache[location]
+
+    await limiter.acquire()
+    response = await get_http_client().get(
+        GEOCODING_URL,
+        params={"q": f"{location},IN", "limit": 1, "appid": WEATHER_API_KEY}
+    )
+    response.raise_for_status()
+    results = response.json()
+
+    coordinates = (results[0]["lat"], results[0]["lon"]) if results else None
+    _geocode_cache[location] = coordinates
+    return coordinates
+
+async def prefetch_weather(locations: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Refresh the weather cache for every farmer location.
+
+    Locations are resolved to cache cells and deduplicated, then refreshed
+    with bounded concurrency and a shared upstream rate limit. Each forecast
+    (including its agricultural advice) is written to weather_data and to
+    this worker's in-process cache.
+
+    Returns counts of refreshed, failed and skipped cells. A cell is skipped
+    when its persisted forecast is already recent, or (as a location) when
+    the name could not be geocoded.
+    """
+    started = time.monotonic()
+    if locations is None:
+        db = SessionLocal()
+        try:
+            locations = await run_in_threadpool(collect_prefetch_locations, db)
+        finally:
+            db.close()
+
+    limiter = RateLimiter(WEATHER_API_RATE_LIMIT_PER_MINUTE)
+    semaphore = asyncio.Semaphore(WEATHER_PREFETCH_CONCURRENCY)
+    report = {"locations": len(locations), "cells": 0, "refreshed": 0, "failed": 0, "skipped": 0}
+
+    async def resolve(location: str):
+        async with semaphore:
+            try:
+                return await resolve_location(location, limiter)
+            except Exception as e:
+                print(f"Could not geocode {location}: {str(e)}")
+                return None
+
+    cells: Dict[str, Tuple[float, float]] = {}
+    for coordinates in await asyncio.gather(*[resolve(location) for location in locations]):
+        if coordinates is None:
+            report["skipped"] += 1
+            continue
+        cell_key, cell_lat, cell_lon = quantize_location(*coordinates)
+        cells[cell_key] = (cell_lat, cell_lon)
+    report["cells"] = len(cells)
+
+    async def refresh(cell_key: str, cell_lat: float, cell_lon: float):
+        async with semaphore:
+            try:
+                def reload():
+                    return refresh_weather_cell(cell_key, cell_lat, cell_lon)
+
+                recent = await run_in_threadpool(load_weather_snapshot, cell_key, WEATHER_PREFETCH_MIN_AGE_SECONDS)
+                if recent is not None:
+                    data, fetched_at = recent
+                    weather_cache.set(cell_key, data, reload, (datetime.utcnow() - fetched_at).total_seconds())
+                    report["skipped"] += 1
+                    return
+
+                await limiter.acquire()
+                data, _ = await reload()
+                weather_cache.set(cell_key, data, reload)
+                report["refreshed"] += 1
+            except Exception as e:
+                print(f"Error prefetching weather for cell {cell_key}: {str(e)}")
+                report["failed"] += 1
+
+    await asyncio.gather(*[refresh(key, lat, lon) for key, (lat, lon) in cells.items()])
+
+    report["duration_seconds"] = round(time.monotonic() - started, 2)
+    print(f"Weather prefetch finished: {report}")
+    return report
+
+def seconds_until(clock_time: str, now: Optional[datetime] = None) -> float:
+    """Seconds from now until the next occurrence of an HH:MM local time"""
+    now = now or datetime.now()
+    hour, minute = (int(part) for part in clock_time.split(":"))
+    next_run = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if next_run <= now:
+        next_run += timedelta(days=1)
+    return (next_run - now).total_seconds()
+
+async def run_daily_prefetch_forever(clock_time: str = WEATHER_PREFETCH_TIME):
+    """Run prefetch_weather every day at clock_time; run as a background task"""
+    while True:
+        await asyncio.sleep(seconds_until(clock_time))
+        try:
+            await prefetch_weather()
+        except Exception as e:
+            print(f"Weather prefetch failed: {str(e)}")
+
+if __name__ == "__main__":
+    # One-off run, e.g. from cron: python -m app.services.weather_prefetch
+    async def _main():
+        try:
+            await prefetch_weather()
+        finally:
+            from .http_client import close_http_client
+            await close_http_client()
+
+    asyncio.run(_main())
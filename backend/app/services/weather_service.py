@@ -0,0 +1,274 @@
+# services/weather_service.py
+import os
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from .http_client import get_http_client
+from .weather_cache import quantize_location, weather_cache
+from .weather_store import load_weather_snapshot, save_weather_snapshot
+
+if TYPE_CHECKING:
+    import httpx
+
+# Mock API key - in a real app, this would be stored in environment variables
+WEATHER_API_KEY = os.getenv("WEATHER_API_KEY", "mock_api_key")
+WEATHER_API_URL = "https://api.openweathermap.org/data/2.5"
+WEATHER_REQUEST_TIMEOUT = float(os.getenv("WEATHER_REQUEST_TIMEOUT", "8"))
+
+# One Call versions in order of preference. 3.0 needs a separate subscription,
+# so whichever version last answered successfully is tried first.
+ONECALL_VERSIONS = ["3.0", "2.5"]
+_working_onecall_version: Optional[str] = None
+
+async def _request_onecall(lat: float, lon: float) -> "httpx.Response":
+    """
+    Call the One Call endpoint on the shared HTTP client.
+
+    The version that worked last time is tried first, so we only fall back
+    (and re-probe the other version) when it stops working.
+    """
+    global _working_onecall_version
+    client = get_http_client()
+    
+    versions = list(ONECALL_VERSIONS)
+    if _working_onecall_version in versions:
+        versions.remove(_working_onecall_version)
+        versions.insert(0, _working_onecall_version)
+    
+    response = None
+    for version in versions:
+        response = await client.get(
+            f"https://api.openweathermap.org/data/{version}/onecall",
+            params={
+                "lat": lat,
+                "lon": lon,
+                "exclude": "minutely",
+                "units": "metric",
+                "appid": WEATHER_API_KEY
+            },
+            timeout=WEATHER_REQUEST_TIMEOUT
+        )
+        if response.status_code == 200:
+            _working_onecall_version = version
+            return response
+    
+    return response
+
+async def get_weather_data(lat: float, lon: float):
+    """
+    Get weather data for a location, served from the weather cache.
+
+    Requests are snapped to a grid cell so nearby callers share one
+    upstream fetch. A fresh copy of the top-level dict is returned because
+    callers overwrite the city fields.
+    """
+    cell_key, cell_lat, cell_lon = quantize_location(lat, lon)
+    data = await weather_cache.get_or_fetch(
+        cell_key,
+        lambda: load_weather_cell(cell_key, cell_lat, cell_lon),
+        refresh=lambda: refresh_weather_cell(cell_key, cell_lat, cell_lon)
+    )
+    return {**data, "lat": lat, "lon": lon}
+
+async def load_weather_cell(cell_key: str, cell_lat: float, cell_lon: float) -> Tuple[Dict[str, Any], float]:
+    """
+    Load a cell from the persisted weather_data snapshot if it is fresh,
+    otherwise fetch it upstream and persist it for the other workers.
+
+    Returns (forecast, age in seconds); a snapshot is as old as its
+    fetched_at, so the in-process cache does not treat it as new.
+    """
+    snapshot = await run_in_threadpool(load_weather_snapshot, cell_key)
+    if snapshot is None:
+        return await refresh_weather_cell(cell_key, cell_lat, cell_lon)
+    data, fetched_at = snapshot
+    return data, (datetime.utcnow() - fetched_at).total_seconds()
+
+async def refresh_weather_cell(cell_key: str, cell_lat: float, cell_lon: float) -> Tuple[Dict[str, Any], float]:
+    """
+    Fetch a cell upstream and persist it for the other workers.
+
+    Background refreshes call this directly: the snapshot is what the cached
+    copy was loaded from, so reading it again would not make it newer.
+    """
+    data = await fetch_weather_data(cell_lat, cell_lon)
+    await run_in_threadpool(save_weather_snapshot, cell_key, cell_lat, cell_lon, data)
+    return data, 0.0
+
+# Helper function to get weather data from OpenWeatherMap API
+async def fetch_weather_data(lat: float, lon: float):
+    """
+    Fetch live weather data from OpenWeatherMap API.
+    """
+    try:
+        response = await _request_onecall(lat, lon)
+        
+        if response.status_code != 200:
+            # If no One Call version works, we could try getting current weather + forecast separately,
+            # but for this implementation we'll assume one of the One Call versions works or raise the error.
+            error_detail = response.json().get("message", "Unknown error")
+            raise HTTPException(status_code=response.status_code, detail=f"OpenWeatherMap API error: {error_detail}")
+        
+        data = response.json()
+        
+        # Extract and format the data to match our pydantic models
+        # Current
+        current_raw = data.get("current", {})
+        current = {
+            "date": datetime.fromtimestamp(current_raw.get("dt")).isoformat(),
+            "temperature": current_raw.get("temp"),
+            "feels_like": current_raw.get("feels_like"),
+            "temp_min": current_raw.get("temp"),  # OneCall current doesn't have min/max
+            "temp_max": current_raw.get("temp"),
+            "pressure": current_raw.get("pressure"),
+            "humidity": current_raw.get("humidity"),
+            "weather_main": current_raw.get("weather")[0].get("main"),
+            "weather_description": current_raw.get("weather")[0].get("description"),
+            "wind_speed": current_raw.get("wind_speed"),
+            "wind_direction": current_raw.get("wind_deg"),
+            "clouds": current_raw.get("clouds"),
+            "rain_1h": current_raw.get("rain", {}).get("1h"),
+            "icon": current_raw.get("weather")[0].get("icon")
+        }
+        
+        # Hourly (next 24 hours)
+        hourly = []
+        for h in data.get("hourly", [])[:24]:
+            hourly.append({
+                "date": datetime.fromtimestamp(h.get("dt")).isoformat(),
+                "temperature": h.get("temp"),
+                "feels_like": h.get("feels_like"),
+                "temp_min": h.get("temp"),
+                "temp_max": h.get("temp"),
+                "pressure": h.get("pressure"),
+                "humidity": h.get("humidity"),
+                "weather_main": h.get("weather")[0].get("main"),
+                "weather_description": h.get("weather")[0].get("description"),
+                "wind_speed": h.get("wind_speed"),
+                "wind_direction": h.get("wind_deg"),
+                "clouds": h.get("clouds"),
+                "rain_1h": h.get("rain", {}).get("1h"),
+                "icon": h.get("weather")[0].get("icon")
+            })
+        
+        # Daily (next 7 days)
+        daily = []
+        for d in data.get("daily", [])[:7]:
+            temp = d.get("temp", {})
+            daily.append({
+                "date": datetime.fromtimestamp(d.get("dt")).isoformat(),
+                "temperature": temp.get("day"),
+                "feels_like": d.get("feels_like", {}).get("day"),
+                "temp_min": temp.get("min"),
+                "temp_max": temp.get("max"),
+                "pressure": d.get("pressure"),
+                "humidity": d.get("humidity"),
+                "weather_main": d.get("weather")[0].get("main"),
+                "weather_description": d.get("weather")[0].get("description"),
+                "wind_speed": d.get("wind_speed"),
+                "wind_direction": d.get("wind_deg"),
+                "clouds": d.get("clouds"),
+                "rain_1h": d.get("rain"), # Daily rain is often just 'rain' or 'snow'
+                "icon": d.get("weather")[0].get("icon")
+            })
+        
+        # Generate agricultural advice based on live weather
+        agricultural_advice = generate_agricultural_advice(current, daily)
+        
+        # Get city name from coordinates (OpenWeatherMap doesn't provide it in One Call)
+        # For simplicity, we'll keep the placeholders or return coordinates
+        return {
+            "city": "Coordinates Location",
+            "state": None,
+            "country": "IN",
+            "lat": lat,
+            "lon": lon,
+            "current": current,
+            "hourly": hourly,
+            "daily": daily,
+            "agricultural_advice": agricultural_advice
+        }
+        
+    except Exception as e:
+        if isinstance(e, HTTPException):
+            raise e
+        raise HTTPException(status_code=500, detail=f"Unexpected error fetching weather data: {str(e)}")
+
+def generate_agricultural_advice(current: Dict[str, Any], daily: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Generate agricultural advice based on weather conditions"""
+    
+    # Check for rain in the forecast
+    rain_days = [day for day in daily if day.get("rain_1h")]
+    has_rain = len(rain_days) > 0
+    
+    # Check temperature trends
+    avg_temp = sum(day["temperature"] for day in daily) / len(daily)
+    high_temp = max(day["temp_max"] for day in daily)
+    
+    # Generate advice
+    general_advice = []
+    crop_specific = {}
+    alerts = []
+    
+    # Temperature-based advice
+    if high_temp > 35:
+        general_advice.append("High temperatures expected. Ensure adequate irrigation for crops.")
+        alerts.append({
+            "type": "high_temperature",
+            "message": "Temperatures above 35°C expected. Take precautions to protect sensitive crops."
+        })
+    
+    # Rain-based advice
+    if has_rain:
+        rain_dates = [day["date"].split("T")[0] for day in rain_days]
+        general_advice.append(f"Rain expected on {', '.join(rain_dates)}. Plan field activities accordingly.")
+        
+        if any(day.get("rain_1h", 0) > 3.0 for day in rain_days):
+            alerts.append({
+                "type": "heavy_rain",
+                "message": "Heavy rainfall expected. Ensure proper drainage in fields."
+            })
+    else:
+        general_advice.append("No significant rainfall expected in the next 7 days. Plan irrigation accordingly.")
+    
+    # Wind-based advice
+    if any(day["wind_speed"] > 5.0 for day in daily):
+        general_advice.append("Strong winds expected. Secure any structures and consider wind protection for young plants.")
+    
+    # Crop-specific advice (simplified for demo)
+    crop_specific = {
+        "rice": [
+            "Maintain water level in paddy fields" if has_rain else "Ensure regular irrigation",
+            "Watch for pest activity in humid conditions" if current["humidity"] > 70 else "Monitor for water stress"
+        ],
+        "wheat": [
+            "Ensure proper drainage during rain" if has_rain else "Provide irrigation as needed",
+            "High temperatures may accelerate growth" if avg_temp > 30 else "Growth may be optimal at current temperatures"
+        ],
+        "cotton": [
+            "Protect from heavy rain" if has_rain else "Regular irrigation recommended",
+            "Watch for bollworm activity in current conditions"
+        ],
+        "vegetables": [
+            "Protect leafy vegetables from heavy rain" if has_rain else "Regular watering recommended",
+            "Consider shade for sensitive vegetables during peak temperatures"
+        ]
+    }
+    
+    # Planting recommendations
+    if 25 <= avg_temp <= 32 and not has_rain:
+        planting_recommendations = ["okra", "cucumber", "pumpkin", "watermelon"]
+    elif has_rain and 20 <= avg_temp <= 30:
+        planting_recommendations = ["rice", "maize", "soybean"]
+    else:
+        planting_recommendations = ["wait for more suitable conditions"]
+    
+    return {
+        "general_advice": general_advice,
+        "crop_specific": crop_specific,
+        "alerts": alerts,
+        "planting_recommendations": planting_recommendations
+    }
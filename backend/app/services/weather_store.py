@@ -0,0 +1,73 @@
+# services/weather_store.py
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from ..db import SessionLocal
+from ..models.weather import WeatherData
+
+# How long a forecast persisted by any worker is reused before refetching
+WEATHER_DB_FRESHNESS_SECONDS = float(os.getenv("WEATHER_DB_FRESHNESS_SECONDS", "900"))
+
+def load_weather_snapshot(cell_key: str, max_age_seconds: float = WEATHER_DB_FRESHNESS_SECONDS) -> Optional[Tuple[Dict[str, Any], datetime]]:
+    """
+    Return (forecast, fetched_at) persisted for a cell if it is fresh enough.
+
+    This is the second cache tier: it is shared by every worker and survives
+    restarts. Database errors are treated as a miss.
+    """
+    db = SessionLocal()
+    try:
+        row = db.query(WeatherData.forecast, WeatherData.fetched_at).filter(
+            WeatherData.cell_key == cell_key
+        ).first()
+        if row is None or row.fetched_at is None or row.forecast is None:
+            return None
+        if datetime.utcnow() - row.fetched_at > timedelta(seconds=max_age_seconds):
+            return None
+        return row.forecast, row.fetched_at
+    except SQLAlchemyError as e:
+        print(f"Error reading weather snapshot {cell_key}: {str(e)}")
+        return None
+    finally:
+        db.close()
+
+def save_weather_snapshot(cell_key: str, lat: float, lon: float, data: Dict[str, Any]):
+    """Insert or update the persisted forecast for a cell"""
+    current = data.get("current") or {}
+    values = {
+        "location": f"{lat},{lon}",
+        "district": data.get("city"),
+        "state": data.get("state"),
+        "latitude": lat,
+        "longitude": lon,
+        "temperature": current.get("temperature"),
+        "humidity": current.get("humidity"),
+        "wind_speed": current.get("wind_speed"),
+        "precipitation": current.get("rain_1h") or 0.0,
+        "forecast": data,
+        "fetched_at": datetime.utcnow(),
+    }
+
+    db = SessionLocal()
+    try:
+        for _ in range(2):
+            row = db.query(WeatherData).filter(WeatherData.cell_key == cell_key).first()
+            if row is None:
+                row = WeatherData(cell_key=cell_key)
+                db.add(row)
+            for key, value in values.items():
+                setattr(row, key, value)
+            try:
+                db.commit()
+                return
+            except IntegrityError:
+                # Another worker inserted the same cell first; update its row instead
+                db.rollback()
+    except SQLAlchemyError as e:
+        db.rollback()
+        print(f"Error saving weather snapshot {cell_key}: {str(e)}")
+    finally:
+        db.close()
@@ -0,0 +1,58 @@
+# utils/body_limit.py
+from typing import Callable, Type
+
+from fastapi import HTTPException, Request
+from fastapi.routing import APIRoute
+from starlette.types import Message
+
+# Room for multipart boundaries and small form fields around an upload
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"File too large. Maximum size is {max_bytes // (1024 * 1024)} MB."
+    )
+
+def limit_request_body(request: Request, max_bytes: int) -> Request:
+    """
+    Return the request with its body capped at max_bytes (plus multipart overhead).
+
+    A declared Content-Length over the cap is rejected right away. Otherwise
+    the bytes are counted as they arrive, so an oversized or chunked body is
+    cut off while it is being parsed instead of after it has been spooled
+    to disk.
+    """
+    limit = max_bytes + MULTIPART_OVERHEAD_BYTES
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > limit:
+        raise _too_large(max_bytes)
+
+    receive = request.receive
+    received = 0
+
+    async def limited_receive() -> Message:
+        nonlocal received
+        message = await receive()
+        if message["type"] == "http.request":
+            received += len(message.get("body", b""))
+            if received > limit:
+                # FastAPI re-raises HTTPExceptions from body parsing, so this becomes the response
+                raise _too_large(max_bytes)
+        return message
+
+    return Request(request.scope, limited_receive)
+
+def body_limited_route(max_bytes: int) -> Type[APIRoute]:
+    """APIRoute class for routers whose request bodies may not exceed max_bytes"""
+
+    class BodyLimitedRoute(APIRoute):
+        def get_route_handler(self) -> Callable:
+            handler = super().get_route_handler()
+
+            async def limited_handler(request: Request):
+                return await handler(limit_request_body(request, max_bytes))
+
+            return limited_handler
+
+    return BodyLimitedRoute
@@ -0,0 +1,79 @@
+# utils/pagination.py
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List, Optional
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import DateTime, tuple_
+from sqlalchemy.orm import Query as SQLQuery
+
+# Response header carrying the cursor of the next page, absent on the last page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+class Page:
+    """
+    Pagination parameters of a list request.
+
+    Without a cursor this is classic offset/limit pagination. With a cursor
+    (taken from the X-Next-Cursor header of the previous page) the query
+    resumes after the last row seen, using a keyset condition such as
+    (created_at, id) < (last_created_at, last_id). That condition is served
+    by a composite index, so deep pages cost the same as the first one.
+    """
+
+    def __init__(self, skip: int, limit: int, cursor: Optional[str], response: Response):
+        self.skip = skip
+        self.limit = limit
+        self.cursor = cursor
+        self.response = response
+
+    def paginate(self, query: SQLQuery, *columns, descending: bool = False) -> List[Any]:
+        """
+        Order `query` by `columns` (ending with a unique column, usually the
+        primary key), fetch one page and set the next-page cursor header.
+        """
+        signature = ",".join(f"{column.table.name}.{column.key}" for column in columns) + (":desc" if descending else ":asc")
+        key = tuple_(*columns)
+
+        if self.cursor:
+            values = self._decode(signature, columns)
+            query = query.filter(key < tuple_(*values) if descending else key > tuple_(*values))
+        query = query.order_by(*[column.desc() if descending else column for column in columns])
+        if not self.cursor and self.skip:
+            query = query.offset(self.skip)
+
+        # One extra row tells whether there is a next page
+        rows = query.limit(self.limit + 1).all()
+        if len(rows) > self.limit:
+            rows = rows[:self.limit]
+            self.response.headers[NEXT_CURSOR_HEADER] = self._encode(signature, [getattr(rows[-1], column.key) for column in columns])
+        return rows
+
+    @staticmethod
+    def _encode(signature: str, values: List[Any]) -> str:
+        payload = {"s": signature, "v": [value.isoformat() if isinstance(value, datetime) else value for value in values]}
+        return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+    def _decode(self, signature: str, columns) -> List[Any]:
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(self.cursor + "=" * (-len(self.cursor) % 4)))
+            values = payload["v"]
+            if payload["s"] != signature or len(values) != len(columns):
+                raise ValueError("cursor belongs to a different listing")
+            return [
+                datetime.fromisoformat(value) if isinstance(column.type, DateTime) else value
+                for column, value in zip(columns, values)
+            ]
+        except (binascii.Error, ValueError, KeyError, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+def get_page(
+    response: Response,
+    skip: int = Query(0, ge=0, description="Offset mode: number of rows to skip"),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description=f"Cursor mode: value of the {NEXT_CURSOR_HEADER} header of the previous page; skip is ignored"),
+) -> Page:
+    """Dependency shared by list endpoints for offset and cursor pagination"""
+    return Page(skip, limit, cursor, response)
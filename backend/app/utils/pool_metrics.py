@@ -0,0 +1,96 @@
+# utils/pool_metrics.py
+import threading
+import time
+from collections import deque
+from typing import Any, Dict
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from .timing import percentile_ms
+
+# Recent checkout waits kept for the percentiles
+WAIT_SAMPLE_SIZE = 1000
+
+class PoolMetrics:
+    """Checkout wait times, timeouts and peak connections of one pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=WAIT_SAMPLE_SIZE)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.peak_in_use = 0
+
+    def record_checkout(self, wait: float, in_use: int):
+        with self._lock:
+            self._waits.append(wait)
+            self.checkouts += 1
+            self.wait_seconds_total += wait
+            self.peak_in_use = max(self.peak_in_use, in_use)
+
+    def record_timeout(self, wait: float):
+        # Failed checkouts count towards the wait percentiles; they waited longest
+        with self._lock:
+            self._waits.append(wait)
+            self.timeouts += 1
+            self.wait_seconds_total += wait
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = sorted(self._waits)
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_ms_p50": percentile_ms(waits, 0.5),
+                "wait_ms_p95": percentile_ms(waits, 0.95),
+                "wait_ms_max": percentile_ms(waits, 1.0),
+                "wait_seconds_total": round(self.wait_seconds_total, 3),
+                "peak_in_use": self.peak_in_use,
+            }
+
+class _MeteredPool:
+    """Mixin timing how long each checkout of a QueuePool waits for a connection"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.record_timeout(time.perf_counter() - started)
+            raise
+        self.metrics.record_checkout(time.perf_counter() - started, self.checkedout())
+        return connection
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep counting into the same metrics
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+class MeteredQueuePool(_MeteredPool, QueuePool):
+    """QueuePool with checkout metrics, for sync engines"""
+
+class MeteredAsyncAdaptedQueuePool(_MeteredPool, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool with checkout metrics, for create_async_engine"""
+
+def pool_stats(pool) -> Dict[str, Any]:
+    """Current gauges of `pool` plus its checkout metrics when it is metered"""
+    stats: Dict[str, Any] = {"class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "in_use": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+        })
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        stats.update(metrics.as_dict())
+    return stats
@@ -0,0 +1,139 @@
+# utils/read_routing.py
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+# Cookie telling any worker that this client wrote recently and should read from the primary
+READ_PRIMARY_COOKIE = "read_primary_until"
+
+# Callers remembered per process for read-your-own-writes
+MAX_TRACKED_WRITERS = 10000
+
+# Replay delay of a PostgreSQL standby; 0 when it has replayed everything it received
+POSTGRES_LAG_SQL = """
+SELECT CASE
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+class ReadRouter:
+    """
+    Decides per request whether reads may go to the replica.
+
+    Reads go to the primary when the replica lags more than `max_lag`
+    seconds or cannot be reached (checked at most every `check_interval`
+    seconds), and for `sticky_seconds` after the same caller committed a
+    write, so that nobody reads data older than their own last change.
+    """
+
+    def __init__(self, replica: Optional[Engine], max_lag: float, check_interval: float, sticky_seconds: float):
+        self.replica = replica
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.sticky_seconds = sticky_seconds
+        self._lock = threading.Lock()
+        self._lag: Optional[float] = None
+        self._lag_checked_at = float("-inf")
+        self._writers: "OrderedDict[str, float]" = OrderedDict()
+        self.counts = {"replica": 0, "primary_after_write": 0, "primary_lagging": 0}
+
+    def use_replica(self, request: Request) -> bool:
+        if self.replica is None:
+            return False
+        if self._wrote_recently(request):
+            reason = "primary_after_write"
+        else:
+            lag = self.replica_lag()
+            reason = "primary_lagging" if lag is None or lag > self.max_lag else "replica"
+        with self._lock:
+            self.counts[reason] += 1
+        return reason == "replica"
+
+    def replica_lag(self) -> Optional[float]:
+        """Replica lag in seconds, None when the replica is unreachable"""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._lag_checked_at < self.check_interval:
+                return self._lag
+            # Other requests keep using the previous value while this one checks
+            self._lag_checked_at = now
+
+        lag = self._measure_lag()
+        with self._lock:
+            self._lag = lag
+        return lag
+
+    def _measure_lag(self) -> Optional[float]:
+        try:
+            with self.replica.connect() as connection:
+                if connection.dialect.name == "postgresql":
+                    return float(connection.execute(text(POSTGRES_LAG_SQL)).scalar() or 0)
+                # Other databases have no standard lag query; a reachable replica counts as current
+                connection.execute(text("SELECT 1"))
+                return 0.0
+        except Exception as e:
+            print(f"Read replica unavailable, reading from the primary: {e}")
+            return None
+
+    def record_write(self, request: Request, response: Response):
+        """Route this caller's reads to the primary for the next `sticky_seconds`"""
+        if self.replica is None:
+            return
+        until = time.time() + self.sticky_seconds
+        with self._lock:
+            key = _caller_key(request)
+            self._writers[key] = until
+            self._writers.move_to_end(key)
+            while len(self._writers) > MAX_TRACKED_WRITERS:
+                self._writers.popitem(last=False)
+        # Browsers send the cookie to every worker; the map above covers clients without cookies
+        response.set_cookie(READ_PRIMARY_COOKIE, str(int(until) + 1), max_age=int(self.sticky_seconds) + 1, httponly=True, samesite="lax")
+
+    def _wrote_recently(self, request: Request) -> bool:
+        now = time.time()
+        try:
+            if float(request.cookies.get(READ_PRIMARY_COOKIE, 0)) > now:
+                return True
+        except ValueError:
+            pass
+        with self._lock:
+            until = self._writers.get(_caller_key(request))
+        return until is not None and until > now
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"replica_configured": self.replica is not None, "lag_seconds": self._lag, **self.counts}
+
+def _caller_key(request: Request) -> str:
+    credentials = request.headers.get("authorization")
+    if credentials:
+        return hashlib.sha256(credentials.encode()).hexdigest()
+    return request.client.host if request.client else ""
+
+@event.listens_for(Session, "before_flush")
+def _reject_replica_writes(session, flush_context, instances):
+    if session.info.get("read_only") and (session.new or session.dirty or session.deleted):
+        raise RuntimeError("Attempted to write through a read session; use get_db for writes")
+
+@event.listens_for(Session, "after_flush")
+def _mark_write(session, flush_context):
+    session.info["wrote"] = True
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    if session.info.pop("wrote", False):
+        on_write = session.info.get("on_write")
+        if on_write is not None:
+            on_write()
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session):
+    session.info.pop("wrote", None)
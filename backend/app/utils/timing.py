@@ -0,0 +1,9 @@
+# utils/timing.py
+from typing import Optional, Sequence
+
+def percentile_ms(sorted_seconds: Sequence[float], fraction: float) -> Optional[float]:
+    """The `fraction` percentile (0-1) of sorted durations in seconds, in milliseconds; None when empty"""
+    if not sorted_seconds:
+        return None
+    index = min(len(sorted_seconds) - 1, int(fraction * len(sorted_seconds)))
+    return round(sorted_seconds[index] * 1000, 2)
@@ -0,0 +1,100 @@
+"""
+Connection pool load test.
+
+Runs a fixed number of threads (standing in for the threadpool that runs
+sync routes), each repeatedly checking out a connection, running a query
+and holding the connection for --hold-ms, against pools of different
+sizes. Prints throughput, checkout waits, timeouts and peak connections
+per pool configuration.
+
+    cd backend && python benchmarks/db_pool_load.py
+    cd backend && DATABASE_URL=postgresql://... python benchmarks/db_pool_load.py --use-env
+
+What it shows, and the sizing rules that follow:
+
+* Throughput is capped at (pool_size + max_overflow) / hold time. Threads
+  beyond size + overflow only queue for a connection.
+* Once a request's wait exceeds DB_POOL_TIMEOUT it fails with
+  "QueuePool limit ... overflow ... reached". Either raise size + overflow
+  towards the number of threads that use the database, or make requests
+  hold connections for less time.
+* Every worker process has its own pool. Keep
+  workers * (pool_size + max_overflow) below the database's connection
+  limit, and leave room for migrations and admin sessions.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+if "--use-env" not in sys.argv:
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'db_pool_load.db')}"
+
+from sqlalchemy import create_engine, exc, text  # noqa: E402
+
+from app.db import DATABASE_URL, engine_options  # noqa: E402
+from app.utils.pool_metrics import pool_stats  # noqa: E402
+
+# (pool_size, max_overflow) pairs to compare
+CONFIGURATIONS = [(5, 0), (5, 10), (20, 20), (40, 0)]
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--use-env", action="store_true", help="run against DATABASE_URL instead of a throwaway SQLite file")
+    parser.add_argument("--threads", type=int, default=40, help="concurrent requests (anyio's default threadpool is 40)")
+    parser.add_argument("--requests", type=int, default=25, help="requests per thread")
+    parser.add_argument("--hold-ms", type=float, default=20, help="time each request holds its connection")
+    parser.add_argument("--pool-timeout", type=float, default=0.5)
+    return parser.parse_args()
+
+def run(pool_size: int, max_overflow: int, args) -> dict:
+    engine = create_engine(DATABASE_URL, **engine_options(
+        DATABASE_URL, pool_size=pool_size, max_overflow=max_overflow, pool_timeout=args.pool_timeout
+    ))
+    completed = [0]
+    lock = threading.Lock()
+
+    def request_loop():
+        for _ in range(args.requests):
+            try:
+                with engine.connect() as connection:
+                    connection.execute(text("SELECT 1"))
+                    time.sleep(args.hold_ms / 1000)
+            except exc.TimeoutError:
+                continue
+            with lock:
+                completed[0] += 1
+
+    threads = [threading.Thread(target=request_loop) for _ in range(args.threads)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    stats = pool_stats(engine.pool)
+    engine.dispose()
+    return {"requests_per_second": completed[0] / elapsed, **stats}
+
+def main() -> int:
+    args = parse_args()
+    ceiling = 1000 / args.hold_ms
+    print(f"{args.threads} threads x {args.requests} requests, {args.hold_ms:g} ms per connection, "
+          f"pool_timeout {args.pool_timeout:g} s ({engine_options(DATABASE_URL)['poolclass'].__name__} on "
+          f"{DATABASE_URL.split(':', 1)[0]})")
+    print(f"{'size+overflow':>14} {'req/s':>8} {'ceiling':>8} {'wait p50':>9} {'wait p95':>9} {'timeouts':>9} {'peak':>5}")
+
+    for pool_size, max_overflow in CONFIGURATIONS:
+        result = run(pool_size, max_overflow, args)
+        connections = min(pool_size + max_overflow, args.threads)
+        print(f"{f'{pool_size}+{max_overflow}':>14} {result['requests_per_second']:>8.0f} {connections * ceiling:>8.0f} "
+              f"{result['wait_ms_p50']:>7} ms {result['wait_ms_p95']:>6} ms {result['timeouts']:>9} {result['peak_in_use']:>5}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
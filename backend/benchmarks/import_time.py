@@ -0,0 +1,107 @@
+"""
+Import-time budget for the API.
+
+Imports app.main in fresh interpreters under `python -X importtime`, the
+way a new uvicorn worker does, and reports the slowest third-party
+packages, the total import time and the peak RSS after the import.
+Exits with status 1 when the median import exceeds --budget-ms or when a
+dependency that should load lazily (numpy, PIL, ...) is imported.
+
+    cd backend && python benchmarks/import_time.py
+    cd backend && API_ROUTERS=user python benchmarks/import_time.py --budget-ms 1200
+
+API_ROUTERS (see app/main.py) is passed through, so the report can be
+taken for a worker that serves only some routers.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# Loaded only inside the code paths that need them
+LAZY_MODULES = ["numpy", "PIL", "geopy", "alembic"]
+
+# Left out of the package list (sys.stdlib_module_names needs Python 3.10)
+STDLIB_MODULES = getattr(sys, "stdlib_module_names", frozenset())
+
+# Runs in each fresh interpreter; prints what was loaded and the peak RSS as JSON
+PROBE = """
+import json, resource, sys
+import app.main
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({
+    "rss_kb": rss // 1024 if sys.platform == "darwin" else rss,
+    "modules": sorted(sys.modules),
+}))
+"""
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1500, help="maximum median import time of app.main")
+    parser.add_argument("--top", type=int, default=12, help="number of packages to list")
+    return parser.parse_args()
+
+def parse_importtime(stderr: str):
+    """Cumulative microseconds per third-party package, and the total for app.main"""
+    packages = defaultdict(int)
+    total = 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        name = name.strip()
+        # Only count the outermost import of each package, which already includes its submodules
+        if depth and "." not in name and name not in STDLIB_MODULES:
+            packages[name] = max(packages[name], int(cumulative))
+        if name == "app.main":
+            total = int(cumulative)
+    return packages, total
+
+def main() -> int:
+    args = parse_args()
+    env = dict(os.environ)
+    env["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'import_time.db')}"
+
+    totals, rss, packages, loaded = [], [], defaultdict(list), set()
+    for _ in range(args.runs):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", PROBE], env=env, cwd=BACKEND_DIR, capture_output=True, text=True)
+        if result.returncode:
+            print(result.stderr)
+            return result.returncode
+        run_packages, total = parse_importtime(result.stderr)
+        probe = json.loads(result.stdout.strip().splitlines()[-1])
+        totals.append(total / 1000)
+        rss.append(probe["rss_kb"] / 1024)
+        loaded.update(probe["modules"])
+        for name, cumulative in run_packages.items():
+            packages[name].append(cumulative / 1000)
+
+    routers = env.get("API_ROUTERS", "all")
+    print(f"Import of app.main over {args.runs} runs (API_ROUTERS={routers}, median):")
+    print(f"  total     {statistics.median(totals):7.0f} ms  ({min(totals):.0f}-{max(totals):.0f}), budget {args.budget_ms:.0f} ms")
+    print(f"  peak RSS  {statistics.median(rss):7.1f} MB")
+    print("Slowest third-party packages (cumulative):")
+    slowest = sorted(packages.items(), key=lambda item: statistics.median(item[1]), reverse=True)
+    for name, values in slowest[:args.top]:
+        print(f"  {name:<20} {statistics.median(values):7.1f} ms")
+
+    failed = False
+    eager = [name for name in LAZY_MODULES if name in loaded]
+    if eager:
+        print(f"FAIL: imported at startup, should be lazy: {', '.join(eager)}")
+        failed = True
+    if statistics.median(totals) > args.budget_ms:
+        print(f"FAIL: import takes longer than {args.budget_ms:.0f} ms")
+        failed = True
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+"""
+Throughput of batched crop-disease inference.
+
+Runs the dummy model over synthetic camera-sized JPEGs at several batch
+sizes and reports images per second and batch fill ratio for each.
+
+    cd backend && python benchmarks/inference_throughput.py
+    cd backend && python benchmarks/inference_throughput.py --images 512 --batch-sizes 1 16 64
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np  # noqa: E402
+from PIL import Image  # noqa: E402
+
+from app.services.inference import BatchInferenceEngine, DummyDiseaseModel  # noqa: E402
+
+# Distinct synthetic uploads, reused round-robin
+DISTINCT_IMAGES = 16
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--images", type=int, default=256)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32])
+    return parser.parse_args()
+
+def main() -> int:
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as folder:
+        rng = np.random.default_rng(0)
+        paths = []
+        for i in range(DISTINCT_IMAGES):
+            path = os.path.join(folder, f"leaf_{i}.jpg")
+            Image.fromarray(rng.integers(0, 255, size=(1200, 1600, 3), dtype=np.uint8)).save(path, quality=85)
+            paths.append(path)
+        items = [(paths[i % len(paths)], None) for i in range(args.images)]
+        catalog = {f"Disease {i}": {"demo": i} for i in range(10)}
+
+        for batch_size in args.batch_sizes:
+            engine = BatchInferenceEngine(DummyDiseaseModel(list(catalog)), catalog, batch_size)
+            for start in range(0, args.images, batch_size):
+                engine.run_batch(items[start:start + batch_size])
+            print(f"batch_size={batch_size}: {engine.stats.as_dict()}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+Login throughput benchmark.
+
+Fires concurrent POST /users/token requests at the app in-process while
+probing GET / every 10 ms, then reports logins per second and how late the
+probe answered (a blocked event loop shows up as a high probe latency).
+
+    cd backend && python benchmarks/login_throughput.py
+    cd backend && python benchmarks/login_throughput.py --logins 64 --concurrency 32
+
+Without --threads both modes are run, each in its own process: inline
+hashing (PASSWORD_HASH_THREADS=0, the old behaviour) and a pool with one
+thread per core. --threads N runs a single mode.
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+PASSWORD = "demo123"
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--threads", type=int, default=None, help="PASSWORD_HASH_THREADS for a single run")
+    return parser.parse_args()
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))] if values else 0.0
+
+async def run(logins: int, concurrency: int):
+    import httpx
+    from passlib.context import CryptContext
+
+    from app.db import Base, SessionLocal, engine
+    import app.models  # noqa: F401
+    from app.models.user import User
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        hashed = CryptContext(schemes=["bcrypt"]).hash(PASSWORD)
+        db.add_all([
+            User(id=str(i), email=f"farmer{i}@example.com", name=f"Farmer {i}", password=hashed, role="farmer", verified=True)
+            for i in range(concurrency)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+    from app.main import app
+    from app.services.password_hasher import password_hasher
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        # Warm up imports and the first bcrypt call outside the measurement
+        await client.post("/users/token", data={"username": "farmer0@example.com", "password": PASSWORD})
+
+        queue = asyncio.Queue()
+        for i in range(logins):
+            queue.put_nowait(i)
+        login_latencies = []
+        probe_latencies = []
+        done = asyncio.Event()
+
+        async def login_worker():
+            while not queue.empty():
+                i = queue.get_nowait()
+                started = time.perf_counter()
+                response = await client.post(
+                    "/users/token",
+                    data={"username": f"farmer{i % concurrency}@example.com", "password": PASSWORD}
+                )
+                assert response.status_code == 200, response.text
+                login_latencies.append(time.perf_counter() - started)
+
+        async def probe():
+            # Time from when the probe was due (after a 10 ms pause) until GET / returned,
+            # so waiting for a blocked event loop counts too
+            while not done.is_set():
+                due = time.perf_counter() + 0.01
+                await asyncio.sleep(0.01)
+                await client.get("/")
+                probe_latencies.append(time.perf_counter() - due)
+
+        probe_task = asyncio.create_task(probe())
+        started = time.perf_counter()
+        await asyncio.gather(*[login_worker() for _ in range(concurrency)])
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probe_task
+
+    stats = password_hasher.stats()
+    print(
+        f"threads={password_hasher.threads or 'inline'}: {logins / elapsed:.1f} logins/s, "
+        f"login p95 {_percentile(login_latencies, 0.95) * 1000:.0f} ms, "
+        f"probe p50 {_percentile(probe_latencies, 0.5) * 1000:.0f} ms / max {max(probe_latencies) * 1000:.0f} ms, "
+        f"hash queue p95 {stats['queue_ms_p95']} ms"
+    )
+
+def main() -> int:
+    args = parse_args()
+
+    if args.threads is None:
+        for threads in (0, os.cpu_count() or 1):
+            result = subprocess.run([
+                sys.executable, os.path.abspath(__file__), "--logins", str(args.logins),
+                "--concurrency", str(args.concurrency), "--threads", str(threads)
+            ], cwd=BACKEND_DIR)
+            if result.returncode:
+                return result.returncode
+        return 0
+
+    os.environ["PASSWORD_HASH_THREADS"] = str(args.threads)
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'login_throughput.db')}"
+    sys.path.insert(0, BACKEND_DIR)
+    asyncio.run(run(args.logins, args.concurrency))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
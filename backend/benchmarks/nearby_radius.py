@@ -0,0 +1,86 @@
+"""
+Edge-of-radius check for the AgriConnect nearby lookups.
+
+Seeds a throwaway SQLite database with services just inside and just
+outside the search radius, due north, south, east and west of several
+centers (including one close to a pole), and fails unless both the SQL
+path and the in-memory snapshot return exactly the ones inside.
+
+    cd backend && python benchmarks/nearby_radius.py
+"""
+import math
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+_db_file = os.path.join(tempfile.mkdtemp(), "nearby_radius.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_file}"
+
+from app.db import Base, SessionLocal, engine  # noqa: E402
+import app.models  # noqa: E402,F401
+from app.models.location import AgriService  # noqa: E402
+from app.routers.agriconnect import _nearby_from_sql  # noqa: E402
+from app.services.geo import EARTH_RADIUS_KM, ServiceSnapshot, encode_geohash  # noqa: E402
+
+# (latitude, longitude, radius_km) of each search
+CENTERS = [(19.0, 73.0, 10.0), (18.52, 73.86, 0.5), (0.0, 0.0, 25.0), (69.0, 20.0, 50.0), (89.9, 0.0, 20.0)]
+
+# Distance of the seeded points as a fraction of the radius
+INSIDE, OUTSIDE = 0.999, 1.001
+
+BEARINGS = {"north": 0.0, "east": 90.0, "south": 180.0, "west": 270.0}
+
+def destination(latitude: float, longitude: float, bearing: float, distance_km: float):
+    """Point distance_km away along a great circle, on the sphere haversine_km uses"""
+    lat1, lon1, theta = math.radians(latitude), math.radians(longitude), math.radians(bearing)
+    delta = distance_km / EARTH_RADIUS_KM
+    lat2 = math.asin(math.sin(lat1) * math.cos(delta) + math.cos(lat1) * math.sin(delta) * math.cos(theta))
+    lon2 = lon1 + math.atan2(
+        math.sin(theta) * math.sin(delta) * math.cos(lat1),
+        math.cos(delta) - math.sin(lat1) * math.sin(lat2)
+    )
+    return math.degrees(lat2), (math.degrees(lon2) + 540.0) % 360.0 - 180.0
+
+def seed():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        for center, (latitude, longitude, radius) in enumerate(CENTERS):
+            for direction, bearing in BEARINGS.items():
+                for label, fraction in (("inside", INSIDE), ("outside", OUTSIDE)):
+                    lat, lon = destination(latitude, longitude, bearing, radius * fraction)
+                    db.add(AgriService(
+                        name=f"{center} {direction} {label}", service_type=f"center{center}",
+                        latitude=lat, longitude=lon, geohash=encode_geohash(lat, lon), is_active=True
+                    ))
+        db.commit()
+    finally:
+        db.close()
+
+def main() -> int:
+    seed()
+    db = SessionLocal()
+    failed = False
+    try:
+        snapshot = ServiceSnapshot.load(db)
+        names = dict(db.query(AgriService.id, AgriService.name).all())
+        for center, (latitude, longitude, radius) in enumerate(CENTERS):
+            service_type = f"center{center}"
+            expected = {f"{center} {direction} inside" for direction in BEARINGS}
+            from_sql = {service.name for _, service in _nearby_from_sql(db, latitude, longitude, radius, service_type)}
+            ids, _ = snapshot.nearby(latitude, longitude, radius, service_type)
+            from_snapshot = {names[int(service_id)] for service_id in ids}
+
+            for path, found in (("sql", from_sql), ("snapshot", from_snapshot)):
+                ok = found == expected
+                failed |= not ok
+                detail = "" if ok else f"  missing {sorted(expected - found)}, extra {sorted(found - expected)}"
+                print(f"{'ok  ' if ok else 'FAIL'} {path:<8} ({latitude}, {longitude}) r={radius} km{detail}")
+    finally:
+        db.close()
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+SQL statement budget check for the list endpoints.
+
+Seeds a throwaway SQLite database, calls each endpoint with a small and a
+large page size, and fails if an endpoint runs more statements than its
+budget or if the count grows with the page size (an N+1 regression).
+
+    cd backend && python benchmarks/query_counts.py
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+_db_file = os.path.join(tempfile.mkdtemp(), "query_counts.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_file}"
+
+from app.db import Base, SessionLocal, engine  # noqa: E402
+import app.models  # noqa: E402,F401
+from app.models.chat import ChatMessage, ChatSession  # noqa: E402
+from app.models.complaint import Complaint, ComplaintUpdate  # noqa: E402
+from app.models.disease_detection import CropDisease, DetectionStatus, DiseaseDetection  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.utils.query_counter import count_queries  # noqa: E402
+
+ROWS = 60
+SMALL_PAGE = 5
+LARGE_PAGE = 50
+
+# Maximum statements per request; these routes authenticate from the token's
+# uid/role claims, so there is no user lookup
+BUDGETS = {
+    "/agriscan/detections/": 1,
+    "/complaints/": 2,
+    "/chat/sessions": 2,
+}
+
+def seed():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        db.add(User(id="1", email="farmer@example.com", name="Farmer", password="x", role="farmer", verified=True))
+        diseases = [
+            CropDisease(name=f"Disease {i}", crop_type="rice", symptoms="", treatment="", prevention="")
+            for i in range(5)
+        ]
+        db.add_all(diseases)
+        db.flush()
+
+        for i in range(ROWS):
+            db.add(DiseaseDetection(
+                user_id="1", image_url=f"/uploads/{i}.jpg", crop_type="rice",
+                detected_disease_id=diseases[i % len(diseases)].id, confidence_score=0.9,
+                status=DetectionStatus.DONE
+            ))
+
+            complaint = Complaint(title=f"Complaint {i}", description="", category="water", location="Pune", user_id="1")
+            db.add(complaint)
+            db.flush()
+            db.add_all([ComplaintUpdate(complaint_id=complaint.id, user_id="1", comment="update") for _ in range(3)])
+
+            session = ChatSession(user_id="1", chat_type="ai_chat", title=f"Chat {i}")
+            db.add(session)
+            db.flush()
+            db.add_all([ChatMessage(session_id=session.id, sender_id="1", content="hello") for _ in range(3)])
+        db.commit()
+    finally:
+        db.close()
+
+def main() -> int:
+    seed()
+
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.routers import chat
+    from app.routers.user import create_access_token
+
+    # The chat router is not mounted by app.main yet; check it anyway
+    if not any(getattr(route, "path", "").startswith("/chat") for route in app.routes):
+        app.include_router(chat.router)
+
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'farmer@example.com', 'uid': '1', 'role': 'farmer'})}"}
+
+    failures = 0
+    for path, budget in BUDGETS.items():
+        counts = {}
+        for page_size in (SMALL_PAGE, LARGE_PAGE):
+            with count_queries(engine) as counter:
+                response = client.get(path, params={"limit": page_size}, headers=headers)
+            assert response.status_code == 200, response.text
+            assert len(response.json()) == page_size, f"{path} returned {len(response.json())} rows"
+            counts[page_size] = counter.count
+
+        ok = counts[LARGE_PAGE] == counts[SMALL_PAGE] and counts[LARGE_PAGE] <= budget
+        failures += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {path}: {counts[SMALL_PAGE]} statements for {SMALL_PAGE} rows, "
+              f"{counts[LARGE_PAGE]} for {LARGE_PAGE} rows (budget {budget})")
+
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
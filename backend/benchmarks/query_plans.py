@@ -0,0 +1,160 @@
+"""
+EXPLAIN check for the hot list queries.
+
+Builds the queries the routers run (same filters and ordering), asks the
+database for their plans and fails if a query does not use one of the
+indexes meant for it.
+
+    cd backend && python benchmarks/query_plans.py            # throwaway SQLite
+    cd backend && DATABASE_URL=... python benchmarks/query_plans.py --use-env
+
+With --use-env the check runs against DATABASE_URL, which should be
+migrated to head (alembic upgrade head). On PostgreSQL sequential scans
+are disabled for the check so that small tables still show which index
+the planner would pick.
+"""
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+if "--use-env" not in sys.argv:
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'query_plans.db')}"
+
+from sqlalchemy import select  # noqa: E402
+
+from app.db import Base, engine  # noqa: E402
+from app.models.chat import ChatMessage, ChatSession  # noqa: E402
+from app.models.complaint import Complaint, ComplaintUpdate  # noqa: E402
+from app.models.disease_detection import DetectionStatus, DiseaseDetection  # noqa: E402
+from app.models.location import AgriService, ServiceReview  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+PAGE = 100
+NOW = datetime(2024, 1, 1)
+
+# (description, statement, indexes any of which satisfies the check)
+HOT_QUERIES = [
+    (
+        "complaints of a farmer",
+        select(Complaint).where(Complaint.user_id == "1")
+        .order_by(Complaint.created_at.desc(), Complaint.id.desc()).limit(PAGE),
+        ["ix_complaints_user_id_created_at_id"],
+    ),
+    (
+        "complaints by status",
+        select(Complaint).where(Complaint.status == "pending")
+        .order_by(Complaint.created_at.desc(), Complaint.id.desc()).limit(PAGE),
+        ["ix_complaints_status_created_at_id"],
+    ),
+    (
+        "complaints by category",
+        select(Complaint).where(Complaint.category == "water")
+        .order_by(Complaint.created_at.desc(), Complaint.id.desc()).limit(PAGE),
+        ["ix_complaints_category_created_at_id"],
+    ),
+    (
+        "complaints assigned to an officer",
+        select(Complaint).where(Complaint.assigned_to == "2")
+        .order_by(Complaint.created_at.desc(), Complaint.id.desc()).limit(PAGE),
+        ["ix_complaints_assigned_to_created_at_id"],
+    ),
+    (
+        "updates of a page of complaints",
+        select(ComplaintUpdate).where(ComplaintUpdate.complaint_id.in_([1, 2, 3])),
+        ["ix_complaint_updates_complaint_id"],
+    ),
+    (
+        "detections of a user",
+        select(DiseaseDetection).where(DiseaseDetection.user_id == "1")
+        .order_by(DiseaseDetection.created_at.desc(), DiseaseDetection.id.desc()).limit(PAGE),
+        ["ix_disease_detections_user_id_created_at_id"],
+    ),
+    (
+        "due detection jobs",
+        select(DiseaseDetection).where(
+            DiseaseDetection.status == DetectionStatus.QUEUED.value,
+            DiseaseDetection.available_at <= NOW
+        ).order_by(DiseaseDetection.id).limit(16),
+        ["ix_disease_detections_status_available_at_id", "ix_disease_detections_status"],
+    ),
+    (
+        "messages of a chat session",
+        select(ChatMessage).where(ChatMessage.session_id == 1)
+        .order_by(ChatMessage.created_at, ChatMessage.id).limit(PAGE),
+        ["ix_chat_messages_session_id_created_at_id"],
+    ),
+    (
+        "chat sessions of a user",
+        select(ChatSession).where(ChatSession.user_id == "1")
+        .order_by(ChatSession.updated_at.desc(), ChatSession.id.desc()).limit(PAGE),
+        ["ix_chat_sessions_user_id_updated_at_id"],
+    ),
+    (
+        "active services, newest first",
+        select(AgriService).where(AgriService.is_active == True)
+        .order_by(AgriService.created_at.desc(), AgriService.id.desc()).limit(PAGE),
+        ["ix_agri_services_is_active_created_at_id"],
+    ),
+    (
+        "services by type and district",
+        select(AgriService).where(
+            AgriService.service_type == "vet",
+            AgriService.district == "Pune",
+            AgriService.is_active == True
+        ).limit(PAGE),
+        ["ix_agri_services_service_type_district_is_active"],
+    ),
+    (
+        "services in a district",
+        select(AgriService).where(AgriService.district == "Pune", AgriService.is_active == True).limit(PAGE),
+        ["ix_agri_services_district_is_active"],
+    ),
+    (
+        "reviews of a service",
+        select(ServiceReview).where(ServiceReview.service_id == 1)
+        .order_by(ServiceReview.created_at.desc(), ServiceReview.id.desc()).limit(10),
+        ["ix_service_reviews_service_id_created_at_id"],
+    ),
+    (
+        "users by role",
+        select(User).where(User.role == "farmer").order_by(User.created_at, User.id).limit(PAGE),
+        ["ix_users_role_created_at_id"],
+    ),
+]
+
+def explain(connection, statement) -> str:
+    """The database's plan for `statement` as one lowercase string"""
+    compiled = statement.compile(dialect=connection.dialect, compile_kwargs={"render_postcompile": True})
+    params = compiled.construct_params()
+    if compiled.positiontup:
+        params = tuple(params[name] for name in compiled.positiontup)
+
+    prefix = "EXPLAIN QUERY PLAN " if connection.dialect.name == "sqlite" else "EXPLAIN "
+    rows = connection.exec_driver_sql(prefix + compiled.string, params).fetchall()
+    return "\n".join(" ".join(str(value) for value in row) for row in rows).lower()
+
+def main() -> int:
+    if "--use-env" not in sys.argv:
+        import app.models  # noqa: F401
+        Base.metadata.create_all(bind=engine)
+
+    failures = 0
+    with engine.connect() as connection:
+        if connection.dialect.name == "postgresql":
+            connection.exec_driver_sql("SET enable_seqscan = off")
+
+        for description, statement, indexes in HOT_QUERIES:
+            plan = explain(connection, statement)
+            used = next((index for index in indexes if index.lower() in plan), None)
+            failures += used is None
+            print(f"{'ok  ' if used else 'FAIL'} {description}: {used or 'no expected index in plan'}")
+            if used is None:
+                print("     " + plan.replace("\n", "\n     "))
+
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""
+Cold start benchmark for the API.
+
+Starts fresh interpreters that import app.main and run the lifespan
+startup (schema version check, HTTP client, background tasks), the way a
+new uvicorn worker does, and reports the median time of each phase.
+
+    cd backend && python benchmarks/startup_time.py
+    cd backend && DATABASE_URL=... python benchmarks/startup_time.py --use-env
+
+Without --use-env a throwaway SQLite database is prepared first with
+`python manage.py init`, which is not part of the measurement.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# Runs in each fresh interpreter; prints the phase timings as JSON
+PROBE = """
+import asyncio, json, time
+started = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+
+async def start():
+    async with app.router.lifespan_context(app):
+        return time.perf_counter()
+
+ready = asyncio.run(start())
+print(json.dumps({"import": imported - started, "lifespan": ready - imported, "total": ready - started}))
+"""
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--use-env", action="store_true", help="start against DATABASE_URL instead of a throwaway SQLite file")
+    return parser.parse_args()
+
+def main() -> int:
+    args = parse_args()
+    env = dict(os.environ)
+    if not args.use_env:
+        env["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'startup_time.db')}"
+        subprocess.run([sys.executable, "manage.py", "init"], env=env, cwd=BACKEND_DIR, check=True, capture_output=True)
+
+    runs = []
+    for _ in range(args.runs):
+        result = subprocess.run([sys.executable, "-c", PROBE], env=env, cwd=BACKEND_DIR, capture_output=True, text=True)
+        if result.returncode:
+            print(result.stderr)
+            return result.returncode
+        runs.append(json.loads(result.stdout.strip().splitlines()[-1]))
+
+    print(f"Cold start over {args.runs} runs (median, min-max):")
+    for phase in ("import", "lifespan", "total"):
+        values = [run[phase] * 1000 for run in runs]
+        print(f"  {phase:<9} {statistics.median(values):7.0f} ms  ({min(values):.0f}-{max(values):.0f})")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+import argparse
+import sys
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+def migrate():
+    from app.schema import upgrade_schema
+    upgrade_schema()
+
+def seed():
+    from app.init_db import init_db
+    init_db()
+
+def check():
+    from app.db import engine
+    from app.schema import SchemaVersionError, verify_schema_version
+
+    try:
+        with engine.connect() as connection:
+            verify_schema_version(connection)
+    except SchemaVersionError as e:
+        print(e)
+        return 1
+    print("Database schema is up to date.")
+    return 0
+
+COMMANDS = {
+    "migrate": "apply all migrations (alembic upgrade head)",
+    "seed": "backfill derived columns and add demo data to an empty database",
+    "init": "migrate, then seed; run once for a new database and after each deploy",
+    "check": "exit with status 1 unless the schema is at the latest migration",
+}
+
+if __name__ == "__main__":
+    # Database setup for the API (python run.py) and the detection worker (python worker.py),
+    # which only verify the schema version at startup
+    parser = argparse.ArgumentParser(description="HaritSetu backend management commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in COMMANDS.items():
+        subparsers.add_parser(name, help=help_text)
+    args = parser.parse_args()
+
+    if args.command in ("migrate", "init"):
+        migrate()
+    if args.command in ("seed", "init"):
+        seed()
+    if args.command == "check":
+        sys.exit(check())
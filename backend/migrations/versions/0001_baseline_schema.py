@@ -0,0 +1,574 @@
+"""baseline schema
+
+The schema as shipped before migrations were introduced. Databases created
+earlier by Base.metadata.create_all already have it: mark them with
+`alembic stamp 0001`, then run `alembic upgrade head`.
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-17 21:54:28.193180
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('agri_services',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=True),
+    sa.Column('name_marathi', sa.String(length=255), nullable=True),
+    sa.Column('service_type', sa.String(length=50), nullable=True),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('description_marathi', sa.Text(), nullable=True),
+    sa.Column('address', sa.String(length=255), nullable=True),
+    sa.Column('district', sa.String(length=100), nullable=True),
+    sa.Column('state', sa.String(length=100), nullable=True),
+    sa.Column('latitude', sa.Float(), nullable=True),
+    sa.Column('longitude', sa.Float(), nullable=True),
+    sa.Column('contact_phone', sa.String(length=20), nullable=True),
+    sa.Column('contact_email', sa.String(length=100), nullable=True),
+    sa.Column('website', sa.String(length=255), nullable=True),
+    sa.Column('opening_hours', sa.String(length=100), nullable=True),
+    sa.Column('services_offered', sa.JSON(), nullable=True),
+    sa.Column('image_urls', sa.JSON(), nullable=True),
+    sa.Column('is_verified', sa.Boolean(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('agri_services', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_agri_services_id'), ['id'], unique=False)
+
+    op.create_table('courses',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=255), nullable=True),
+    sa.Column('title_marathi', sa.String(length=255), nullable=True),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('description_marathi', sa.Text(), nullable=True),
+    sa.Column('category', sa.String(length=50), nullable=True),
+    sa.Column('difficulty_level', sa.String(length=20), nullable=True),
+    sa.Column('image_url', sa.String(length=255), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('courses', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_courses_id'), ['id'], unique=False)
+
+    op.create_table('crop_diseases',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=True),
+    sa.Column('name_marathi', sa.String(length=255), nullable=True),
+    sa.Column('crop_type', sa.String(length=100), nullable=True),
+    sa.Column('symptoms', sa.Text(), nullable=True),
+    sa.Column('symptoms_marathi', sa.Text(), nullable=True),
+    sa.Column('treatment', sa.Text(), nullable=True),
+    sa.Column('treatment_marathi', sa.Text(), nullable=True),
+    sa.Column('prevention', sa.Text(), nullable=True),
+    sa.Column('prevention_marathi', sa.Text(), nullable=True),
+    sa.Column('image_urls', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('crop_diseases', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_crop_diseases_id'), ['id'], unique=False)
+
+    op.create_table('document_templates',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=True),
+    sa.Column('document_type', sa.String(length=50), nullable=True),
+    sa.Column('template_content', sa.Text(), nullable=True),
+    sa.Column('template_content_marathi', sa.Text(), nullable=True),
+    sa.Column('required_fields', sa.JSON(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('document_templates', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_document_templates_id'), ['id'], unique=False)
+
+    op.create_table('kisan_mitra_faqs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('question_en', sa.Text(), nullable=False),
+    sa.Column('question_mr', sa.Text(), nullable=False),
+    sa.Column('answer_en', sa.Text(), nullable=False),
+    sa.Column('answer_mr', sa.Text(), nullable=False),
+    sa.Column('category', sa.String(length=100), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('kisan_mitra_faqs', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_kisan_mitra_faqs_id'), ['id'], unique=False)
+
+    op.create_table('users',
+    sa.Column('id', sa.String(length=50), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=True),
+    sa.Column('name', sa.String(length=255), nullable=True),
+    sa.Column('phone', sa.String(length=20), nullable=True),
+    sa.Column('password', sa.String(length=255), nullable=True),
+    sa.Column('role', sa.String(length=50), nullable=True),
+    sa.Column('village', sa.String(length=255), nullable=True),
+    sa.Column('district', sa.String(length=255), nullable=True),
+    sa.Column('expertise', sa.String(length=1000), nullable=True),
+    sa.Column('department', sa.String(length=255), nullable=True),
+    sa.Column('verified', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_users_email'), ['email'], unique=True)
+        batch_op.create_index(batch_op.f('ix_users_id'), ['id'], unique=False)
+
+    op.create_table('weather_alerts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('alert_type', sa.String(length=50), nullable=True),
+    sa.Column('severity', sa.String(length=20), nullable=True),
+    sa.Column('message', sa.Text(), nullable=True),
+    sa.Column('message_marathi', sa.Text(), nullable=True),
+    sa.Column('location', sa.String(length=255), nullable=True),
+    sa.Column('district', sa.String(length=100), nullable=True),
+    sa.Column('state', sa.String(length=100), nullable=True),
+    sa.Column('start_time', sa.DateTime(), nullable=True),
+    sa.Column('end_time', sa.DateTime(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('weather_alerts', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_weather_alerts_id'), ['id'], unique=False)
+
+    op.create_table('weather_data',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('location', sa.String(length=255), nullable=True),
+    sa.Column('district', sa.String(length=100), nullable=True),
+    sa.Column('state', sa.String(length=100), nullable=True),
+    sa.Column('temperature', sa.Float(), nullable=True),
+    sa.Column('humidity', sa.Float(), nullable=True),
+    sa.Column('wind_speed', sa.Float(), nullable=True),
+    sa.Column('precipitation', sa.Float(), nullable=True),
+    sa.Column('forecast', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('weather_data', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_weather_data_id'), ['id'], unique=False)
+
+    op.create_table('agridocai_documents',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('file_id', sa.String(length=36), nullable=True),
+    sa.Column('filename', sa.String(length=255), nullable=False),
+    sa.Column('file_path', sa.String(length=255), nullable=False),
+    sa.Column('file_type', sa.String(length=20), nullable=False),
+    sa.Column('upload_date', sa.DateTime(), nullable=True),
+    sa.Column('user_id', sa.String(length=50), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('agridocai_documents', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_agridocai_documents_file_id'), ['file_id'], unique=True)
+        batch_op.create_index(batch_op.f('ix_agridocai_documents_id'), ['id'], unique=False)
+
+    op.create_table('chat_sessions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.String(length=50), nullable=True),
+    sa.Column('expert_id', sa.String(length=50), nullable=True),
+    sa.Column('chat_type', sa.String(length=20), nullable=True),
+    sa.Column('title', sa.String(length=255), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['expert_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('chat_sessions', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_chat_sessions_id'), ['id'], unique=False)
+
+    op.create_table('complaints',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=255), nullable=True),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('category', sa.String(length=100), nullable=True),
+    sa.Column('location', sa.String(length=255), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('priority', sa.String(length=20), nullable=True),
+    sa.Column('user_id', sa.String(length=50), nullable=True),
+    sa.Column('assigned_to', sa.String(length=50), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['assigned_to'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('complaints', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_complaints_id'), ['id'], unique=False)
+
+    op.create_table('disease_detections',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.String(length=50), nullable=True),
+    sa.Column('image_url', sa.String(length=255), nullable=True),
+    sa.Column('crop_type', sa.String(length=100), nullable=True),
+    sa.Column('detected_disease_id', sa.Integer(), nullable=True),
+    sa.Column('confidence_score', sa.Float(), nullable=True),
+    sa.Column('additional_notes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['detected_disease_id'], ['crop_diseases.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('disease_detections', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_disease_detections_id'), ['id'], unique=False)
+
+    op.create_table('documents',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.String(length=50), nullable=True),
+    sa.Column('title', sa.String(length=255), nullable=True),
+    sa.Column('document_type', sa.String(length=50), nullable=True),
+    sa.Column('content', sa.Text(), nullable=True),
+    sa.Column('content_marathi', sa.Text(), nullable=True),
+    sa.Column('metadata', sa.JSON(), nullable=True),
+    sa.Column('file_url', sa.String(length=255), nullable=True),
+    sa.Column('is_draft', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('documents', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_documents_id'), ['id'], unique=False)
+
+    op.create_table('kisan_mitra_queries',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.String(length=50), nullable=True),
+    sa.Column('question', sa.Text(), nullable=False),
+    sa.Column('response', sa.Text(), nullable=False),
+    sa.Column('language', sa.String(length=10), nullable=True),
+    sa.Column('timestamp', sa.DateTime(), nullable=True),
+    sa.Column('location', sa.String(length=255), nullable=True),
+    sa.Column('crop_type', sa.String(length=100), nullable=True),
+    sa.Column('related_topics', sa.JSON(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('kisan_mitra_queries', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_kisan_mitra_queries_id'), ['id'], unique=False)
+
+    op.create_table('lessons',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('course_id', sa.Integer(), nullable=True),
+    sa.Column('title', sa.String(length=255), nullable=True),
+    sa.Column('title_marathi', sa.String(length=255), nullable=True),
+    sa.Column('content', sa.Text(), nullable=True),
+    sa.Column('content_marathi', sa.Text(), nullable=True),
+    sa.Column('order', sa.Integer(), nullable=True),
+    sa.Column('video_url', sa.String(length=255), nullable=True),
+    sa.Column('audio_url', sa.String(length=255), nullable=True),
+    sa.Column('image_urls', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['course_id'], ['courses.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('lessons', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_lessons_id'), ['id'], unique=False)
+
+    op.create_table('orders',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('buyer_id', sa.String(length=50), nullable=True),
+    sa.Column('total_amount', sa.Float(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('shipping_address', sa.Text(), nullable=True),
+    sa.Column('contact_phone', sa.String(length=20), nullable=True),
+    sa.Column('payment_method', sa.String(length=50), nullable=True),
+    sa.Column('payment_status', sa.String(length=20), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['buyer_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_orders_id'), ['id'], unique=False)
+
+    op.create_table('products',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=True),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('category', sa.String(length=50), nullable=True),
+    sa.Column('price', sa.Float(), nullable=True),
+    sa.Column('quantity', sa.Float(), nullable=True),
+    sa.Column('unit', sa.String(length=20), nullable=True),
+    sa.Column('location', sa.String(length=255), nullable=True),
+    sa.Column('images', sa.JSON(), nullable=True),
+    sa.Column('seller_id', sa.String(length=50), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('has_subsidy', sa.Boolean(), nullable=True),
+    sa.Column('subsidy_details', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['seller_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_products_id'), ['id'], unique=False)
+
+    op.create_table('service_reviews',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('service_id', sa.Integer(), nullable=True),
+    sa.Column('user_id', sa.String(length=50), nullable=True),
+    sa.Column('rating', sa.Integer(), nullable=True),
+    sa.Column('comment', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['service_id'], ['agri_services.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('service_reviews', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_service_reviews_id'), ['id'], unique=False)
+
+    op.create_table('user_progress',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.String(length=50), nullable=True),
+    sa.Column('course_id', sa.Integer(), nullable=True),
+    sa.Column('completed_lessons', sa.JSON(), nullable=True),
+    sa.Column('completed_quizzes', sa.JSON(), nullable=True),
+    sa.Column('quiz_scores', sa.JSON(), nullable=True),
+    sa.Column('last_activity', sa.DateTime(), nullable=True),
+    sa.Column('is_completed', sa.Boolean(), nullable=True),
+    sa.Column('completion_date', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['course_id'], ['courses.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('user_progress', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_user_progress_id'), ['id'], unique=False)
+
+    op.create_table('user_weather_preferences',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.String(length=50), nullable=True),
+    sa.Column('location', sa.String(length=255), nullable=True),
+    sa.Column('alert_types', sa.JSON(), nullable=True),
+    sa.Column('notification_method', sa.String(length=20), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('user_weather_preferences', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_user_weather_preferences_id'), ['id'], unique=False)
+
+    op.create_table('agridocai_analyses',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('document_id', sa.Integer(), nullable=True),
+    sa.Column('summary', sa.Text(), nullable=True),
+    sa.Column('keywords', sa.JSON(), nullable=True),
+    sa.Column('recommendations', sa.JSON(), nullable=True),
+    sa.Column('analysis_date', sa.DateTime(), nullable=True),
+    sa.Column('language', sa.String(length=10), nullable=True),
+    sa.ForeignKeyConstraint(['document_id'], ['agridocai_documents.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('document_id')
+    )
+    with op.batch_alter_table('agridocai_analyses', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_agridocai_analyses_id'), ['id'], unique=False)
+
+    op.create_table('chat_messages',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('session_id', sa.Integer(), nullable=True),
+    sa.Column('sender_id', sa.String(length=50), nullable=True),
+    sa.Column('content', sa.Text(), nullable=True),
+    sa.Column('language', sa.String(length=10), nullable=True),
+    sa.Column('is_ai_message', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['sender_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['session_id'], ['chat_sessions.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('chat_messages', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_chat_messages_id'), ['id'], unique=False)
+
+    op.create_table('complaint_updates',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('complaint_id', sa.Integer(), nullable=True),
+    sa.Column('user_id', sa.String(length=50), nullable=True),
+    sa.Column('comment', sa.Text(), nullable=True),
+    sa.Column('status_change', sa.String(length=20), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['complaint_id'], ['complaints.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('complaint_updates', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_complaint_updates_id'), ['id'], unique=False)
+
+    op.create_table('order_items',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=True),
+    sa.Column('product_id', sa.Integer(), nullable=True),
+    sa.Column('quantity', sa.Float(), nullable=True),
+    sa.Column('unit_price', sa.Float(), nullable=True),
+    sa.Column('total_price', sa.Float(), nullable=True),
+    sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('order_items', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_order_items_id'), ['id'], unique=False)
+
+    op.create_table('quizzes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('lesson_id', sa.Integer(), nullable=True),
+    sa.Column('title', sa.String(length=255), nullable=True),
+    sa.Column('title_marathi', sa.String(length=255), nullable=True),
+    sa.Column('passing_score', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['lesson_id'], ['lessons.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('quizzes', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_quizzes_id'), ['id'], unique=False)
+
+    op.create_table('quiz_questions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('quiz_id', sa.Integer(), nullable=True),
+    sa.Column('question', sa.Text(), nullable=True),
+    sa.Column('question_marathi', sa.Text(), nullable=True),
+    sa.Column('options', sa.JSON(), nullable=True),
+    sa.Column('options_marathi', sa.JSON(), nullable=True),
+    sa.Column('correct_answer', sa.Integer(), nullable=True),
+    sa.Column('explanation', sa.Text(), nullable=True),
+    sa.Column('explanation_marathi', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['quiz_id'], ['quizzes.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('quiz_questions', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_quiz_questions_id'), ['id'], unique=False)
+
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('quiz_questions', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_quiz_questions_id'))
+
+    op.drop_table('quiz_questions')
+    with op.batch_alter_table('quizzes', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_quizzes_id'))
+
+    op.drop_table('quizzes')
+    with op.batch_alter_table('order_items', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_order_items_id'))
+
+    op.drop_table('order_items')
+    with op.batch_alter_table('complaint_updates', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_complaint_updates_id'))
+
+    op.drop_table('complaint_updates')
+    with op.batch_alter_table('chat_messages', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_chat_messages_id'))
+
+    op.drop_table('chat_messages')
+    with op.batch_alter_table('agridocai_analyses', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_agridocai_analyses_id'))
+
+    op.drop_table('agridocai_analyses')
+    with op.batch_alter_table('user_weather_preferences', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_user_weather_preferences_id'))
+
+    op.drop_table('user_weather_preferences')
+    with op.batch_alter_table('user_progress', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_user_progress_id'))
+
+    op.drop_table('user_progress')
+    with op.batch_alter_table('service_reviews', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_service_reviews_id'))
+
+    op.drop_table('service_reviews')
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_products_id'))
+
+    op.drop_table('products')
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_orders_id'))
+
+    op.drop_table('orders')
+    with op.batch_alter_table('lessons', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_lessons_id'))
+
+    op.drop_table('lessons')
+    with op.batch_alter_table('kisan_mitra_queries', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_kisan_mitra_queries_id'))
+
+    op.drop_table('kisan_mitra_queries')
+    with op.batch_alter_table('documents', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_documents_id'))
+
+    op.drop_table('documents')
+    with op.batch_alter_table('disease_detections', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_disease_detections_id'))
+
+    op.drop_table('disease_detections')
+    with op.batch_alter_table('complaints', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_complaints_id'))
+
+    op.drop_table('complaints')
+    with op.batch_alter_table('chat_sessions', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_chat_sessions_id'))
+
+    op.drop_table('chat_sessions')
+    with op.batch_alter_table('agridocai_documents', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_agridocai_documents_id'))
+        batch_op.drop_index(batch_op.f('ix_agridocai_documents_file_id'))
+
+    op.drop_table('agridocai_documents')
+    with op.batch_alter_table('weather_data', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_weather_data_id'))
+
+    op.drop_table('weather_data')
+    with op.batch_alter_table('weather_alerts', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_weather_alerts_id'))
+
+    op.drop_table('weather_alerts')
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_users_id'))
+        batch_op.drop_index(batch_op.f('ix_users_email'))
+
+    op.drop_table('users')
+    with op.batch_alter_table('kisan_mitra_faqs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_kisan_mitra_faqs_id'))
+
+    op.drop_table('kisan_mitra_faqs')
+    with op.batch_alter_table('document_templates', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_document_templates_id'))
+
+    op.drop_table('document_templates')
+    with op.batch_alter_table('crop_diseases', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_crop_diseases_id'))
+
+    op.drop_table('crop_diseases')
+    with op.batch_alter_table('courses', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_courses_id'))
+
+    op.drop_table('courses')
+    with op.batch_alter_table('agri_services', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_agri_services_id'))
+
+    op.drop_table('agri_services')
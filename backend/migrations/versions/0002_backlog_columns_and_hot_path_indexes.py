@@ -0,0 +1,183 @@
+"""backlog columns and hot path indexes
+
+Adds the columns introduced since the baseline (geohash and rating
+aggregates on agri_services, the detection job queue, content hashes and
+thumbnails on disease_detections, weather cache cells) and the composite
+indexes behind the list endpoints' filters and keyset pagination.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 21:54:34.937393
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_weather_alerts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.String(length=50), nullable=True),
+    sa.Column('alert_id', sa.Integer(), nullable=True),
+    sa.Column('preference_id', sa.Integer(), nullable=True),
+    sa.Column('notification_method', sa.String(length=20), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['alert_id'], ['weather_alerts.id'], ),
+    sa.ForeignKeyConstraint(['preference_id'], ['user_weather_preferences.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('user_weather_alerts', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_user_weather_alerts_alert_id'), ['alert_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_user_weather_alerts_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_user_weather_alerts_user_id'), ['user_id'], unique=False)
+
+    with op.batch_alter_table('agri_services', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('geohash', sa.String(length=12), nullable=True))
+        batch_op.add_column(sa.Column('review_count', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('rating_sum', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('average_rating', sa.Float(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_agri_services_average_rating'), ['average_rating'], unique=False)
+        batch_op.create_index('ix_agri_services_district_is_active', ['district', 'is_active'], unique=False)
+        batch_op.create_index(batch_op.f('ix_agri_services_geohash'), ['geohash'], unique=False)
+        batch_op.create_index('ix_agri_services_is_active_created_at_id', ['is_active', 'created_at', 'id'], unique=False)
+        batch_op.create_index('ix_agri_services_service_type_district_is_active', ['service_type', 'district', 'is_active'], unique=False)
+
+    with op.batch_alter_table('chat_messages', schema=None) as batch_op:
+        batch_op.create_index('ix_chat_messages_session_id_created_at_id', ['session_id', 'created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('chat_sessions', schema=None) as batch_op:
+        batch_op.create_index('ix_chat_sessions_expert_id_updated_at_id', ['expert_id', 'updated_at', 'id'], unique=False)
+        batch_op.create_index('ix_chat_sessions_updated_at_id', ['updated_at', 'id'], unique=False)
+        batch_op.create_index('ix_chat_sessions_user_id_updated_at_id', ['user_id', 'updated_at', 'id'], unique=False)
+
+    with op.batch_alter_table('complaint_updates', schema=None) as batch_op:
+        batch_op.create_index('ix_complaint_updates_complaint_id', ['complaint_id'], unique=False)
+
+    with op.batch_alter_table('complaints', schema=None) as batch_op:
+        batch_op.create_index('ix_complaints_assigned_to_created_at_id', ['assigned_to', 'created_at', 'id'], unique=False)
+        batch_op.create_index('ix_complaints_category_created_at_id', ['category', 'created_at', 'id'], unique=False)
+        batch_op.create_index('ix_complaints_created_at_id', ['created_at', 'id'], unique=False)
+        batch_op.create_index('ix_complaints_status_created_at_id', ['status', 'created_at', 'id'], unique=False)
+        batch_op.create_index('ix_complaints_user_id_created_at_id', ['user_id', 'created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('disease_detections', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('status', sa.String(length=20), nullable=True))
+        batch_op.add_column(sa.Column('image_path', sa.String(length=255), nullable=True))
+        batch_op.add_column(sa.Column('image_sha256', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('thumbnails', sa.JSON(), nullable=True))
+        batch_op.add_column(sa.Column('attempts', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('last_error', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('available_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('started_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('finished_at', sa.DateTime(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_disease_detections_image_sha256'), ['image_sha256'], unique=False)
+        batch_op.create_index(batch_op.f('ix_disease_detections_status'), ['status'], unique=False)
+        batch_op.create_index('ix_disease_detections_status_available_at_id', ['status', 'available_at', 'id'], unique=False)
+        batch_op.create_index('ix_disease_detections_user_id_created_at_id', ['user_id', 'created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('service_reviews', schema=None) as batch_op:
+        batch_op.create_index('ix_service_reviews_service_id_created_at_id', ['service_id', 'created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index('ix_users_created_at_id', ['created_at', 'id'], unique=False)
+        batch_op.create_index('ix_users_role_created_at_id', ['role', 'created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('weather_alerts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('cell_key', sa.String(length=64), nullable=True))
+        batch_op.create_index(batch_op.f('ix_weather_alerts_cell_key'), ['cell_key'], unique=False)
+
+    with op.batch_alter_table('weather_data', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('cell_key', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('latitude', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('longitude', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('fetched_at', sa.DateTime(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_weather_data_cell_key'), ['cell_key'], unique=True)
+
+    # Existing detections were processed inline before the job queue existed
+    op.execute("UPDATE disease_detections SET status = 'done', attempts = 0 WHERE status IS NULL")
+    op.execute("UPDATE agri_services SET review_count = 0, rating_sum = 0 WHERE review_count IS NULL")
+
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('weather_data', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_weather_data_cell_key'))
+        batch_op.drop_column('fetched_at')
+        batch_op.drop_column('longitude')
+        batch_op.drop_column('latitude')
+        batch_op.drop_column('cell_key')
+
+    with op.batch_alter_table('weather_alerts', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_weather_alerts_cell_key'))
+        batch_op.drop_column('cell_key')
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index('ix_users_role_created_at_id')
+        batch_op.drop_index('ix_users_created_at_id')
+
+    with op.batch_alter_table('service_reviews', schema=None) as batch_op:
+        batch_op.drop_index('ix_service_reviews_service_id_created_at_id')
+
+    with op.batch_alter_table('disease_detections', schema=None) as batch_op:
+        batch_op.drop_index('ix_disease_detections_user_id_created_at_id')
+        batch_op.drop_index('ix_disease_detections_status_available_at_id')
+        batch_op.drop_index(batch_op.f('ix_disease_detections_status'))
+        batch_op.drop_index(batch_op.f('ix_disease_detections_image_sha256'))
+        batch_op.drop_column('finished_at')
+        batch_op.drop_column('started_at')
+        batch_op.drop_column('available_at')
+        batch_op.drop_column('last_error')
+        batch_op.drop_column('attempts')
+        batch_op.drop_column('thumbnails')
+        batch_op.drop_column('image_sha256')
+        batch_op.drop_column('image_path')
+        batch_op.drop_column('status')
+
+    with op.batch_alter_table('complaints', schema=None) as batch_op:
+        batch_op.drop_index('ix_complaints_user_id_created_at_id')
+        batch_op.drop_index('ix_complaints_status_created_at_id')
+        batch_op.drop_index('ix_complaints_created_at_id')
+        batch_op.drop_index('ix_complaints_category_created_at_id')
+        batch_op.drop_index('ix_complaints_assigned_to_created_at_id')
+
+    with op.batch_alter_table('complaint_updates', schema=None) as batch_op:
+        batch_op.drop_index('ix_complaint_updates_complaint_id')
+
+    with op.batch_alter_table('chat_sessions', schema=None) as batch_op:
+        batch_op.drop_index('ix_chat_sessions_user_id_updated_at_id')
+        batch_op.drop_index('ix_chat_sessions_updated_at_id')
+        batch_op.drop_index('ix_chat_sessions_expert_id_updated_at_id')
+
+    with op.batch_alter_table('chat_messages', schema=None) as batch_op:
+        batch_op.drop_index('ix_chat_messages_session_id_created_at_id')
+
+    with op.batch_alter_table('agri_services', schema=None) as batch_op:
+        batch_op.drop_index('ix_agri_services_service_type_district_is_active')
+        batch_op.drop_index('ix_agri_services_is_active_created_at_id')
+        batch_op.drop_index(batch_op.f('ix_agri_services_geohash'))
+        batch_op.drop_index('ix_agri_services_district_is_active')
+        batch_op.drop_index(batch_op.f('ix_agri_services_average_rating'))
+        batch_op.drop_column('average_rating')
+        batch_op.drop_column('rating_sum')
+        batch_op.drop_column('review_count')
+        batch_op.drop_column('geohash')
+
+    with op.batch_alter_table('user_weather_alerts', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_user_weather_alerts_user_id'))
+        batch_op.drop_index(batch_op.f('ix_user_weather_alerts_id'))
+        batch_op.drop_index(batch_op.f('ix_user_weather_alerts_alert_id'))
+
+    op.drop_table('user_weather_alerts')
@@ -0,0 +1,18 @@
+import os
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+if __name__ == "__main__":
+    # AgriScan detection worker: claims queued detections and runs inference
+    # in a process pool. Run one or more alongside the API (python run.py).
+    from app.db import engine
+    from app.schema import check_schema
+    from app.services.detection_queue import run_worker
+
+    with engine.connect() as connection:
+        check_schema(connection)
+
+    processes = int(os.getenv("DETECTION_WORKER_PROCESSES", str(os.cpu_count() or 2)))
+    run_worker(processes)